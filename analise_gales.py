@@ -1,16 +1,18 @@
 # analise_gales.py
 import re
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-# Regex para mensagens resolvidas
+from comum import MESSAGE_TEXT_KEYS, html_table, messages_fingerprint
+
+# Regex para mensagens resolvidas (aplicada sobre a linha já em maiúsculas)
 RESOLVED_RE = re.compile(
     r"^(?P<check>[✅❌🃏])(?P<sup>[\u00b9\u00b2\u00b3\d]?)\s*"
     r"(?P<pair>[A-Z0-9\-\_]+(?:-OTC)?)\s*-\s*(?P<time>\d{2}:\d{2}:\d{2})\s*-\s*(?P<tf>\w+)\s*-\s*(?P<dir>\w+)\s*-\s*(?P<r>WIN|LOSS|DOJI)$",
-    flags=re.IGNORECASE,
 )
 
 SUPERSCRIPT_MAP = {
@@ -22,107 +24,199 @@ SUPERSCRIPT_MAP = {
     "3": 3,
 }
 
-def _sup_to_level(s: str) -> int:
-    if not s:
-        return 0
-    return SUPERSCRIPT_MAP.get(s, 0)
+RESULT_CHECKS = ("✅", "❌", "🃏")
+RESULT_CATEGORIES = ["WIN", "LOSS", "DOJI"]
+
+# CSS das tabelas de métricas (enviado junto com a primeira tabela)
+_METRICS_CSS = """
+<style>
+.metrics-table {
+    border-collapse: collapse;
+    width: 100%;
+    font-family: "Inter", "Arial", sans-serif;
+}
+.metrics-table th {
+    background-color: #f7f9fc;
+    color: #333;
+    padding: 12px;
+    text-align: left;
+    font-weight: 600;
+    border-bottom: 2px solid #e6eef6;
+}
+.metrics-table td {
+    padding: 10px 12px;
+    border-top: 1px solid #f0f4f8;
+    color: #333;
+}
+.metrics-table tr:hover {
+    background-color: #f8f9fa;
+}
+</style>
+"""
+
+# Templates HTML dos cards (montados uma única vez, preenchidos com .format)
+_CARD_DIST_TMPL = """
+<div style="background: linear-gradient(135deg, {c1} 0%, {c2} 100%); 
+            border-radius: 12px; padding: 24px; color: white; text-align: center;">
+    <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">{label}</div>
+    <div style="font-size: 36px; font-weight: 700; margin: 8px 0;">{val:,}</div>
+    <div style="font-size: 18px; font-weight: 600; margin-bottom: 8px;">{pct:.2f}%</div>
+    <div style="font-size: 12px; opacity: 0.8;">{footer}</div>
+</div>
+"""
+
+_CARD_WR_TMPL = """
+<div style="background: white; border-left: 4px solid {color}; 
+            border-radius: 8px; padding: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+    <div style="font-size: 13px; color: #666; font-weight: 600; margin-bottom: 8px;">
+        {label}
+    </div>
+    <div style="font-size: 32px; font-weight: 700; color: {color};">
+        {wr:.2f}%
+    </div>
+    <div style="font-size: 13px; color: #666; margin-top: 8px;">
+        {footer}
+    </div>
+</div>
+"""
+
+_CARD_RECUP_TMPL = """
+<div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+            border-radius: 12px; padding: 24px; color: white;">
+    <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">{label}</div>
+    <div style="font-size: 42px; font-weight: 700; margin: 12px 0;">{taxa:.1f}%</div>
+    <div style="font-size: 14px; opacity: 0.9;">
+        {wins:,} vitórias de {total:,} tentativas
+    </div>
+</div>
+"""
+
+_CARD_FALHA_TMPL = """
+<div style="background: #fce4ec; border-left: 4px solid #d93025; 
+            border-radius: 8px; padding: 16px;">
+    <div style="font-size: 13px; color: #666; font-weight: 600;">{label}</div>
+    <div style="font-size: 28px; font-weight: 700; color: #d93025; margin: 8px 0;">
+        {val:,}
+    </div>
+    <div style="font-size: 12px; color: #666;">{footer}</div>
+</div>
+"""
+
+def _cards_row(*cards: str) -> str:
+    """
+    Junta os cards de uma seção num único bloco flex (um só st.markdown).
+    """
+    cells = "".join(f'<div style="flex: 1 1 0; min-width: 200px;">{c.strip()}</div>' for c in cards)
+    return f'<div style="display: flex; flex-wrap: wrap; gap: 16px;">{cells}</div>'
 
 def _get_text_from_msg(msg: dict) -> str:
-    for k in ("text", "message.text", "message", "message_text"):
+    for k in MESSAGE_TEXT_KEYS:
         v = msg.get(k)
         if isinstance(v, str) and v.strip():
             return v
     v = msg.get("text") or msg.get("message")
     return v if isinstance(v, str) else ""
 
-def _extract_records(messages: List[dict]) -> List[dict]:
-    records = []
-    
+def _parse_resolved(messages: List[dict]) -> pd.DataFrame:
+    """
+    Grupos brutos do RESOLVED_RE (um str.extract só) para as linhas resolvidas.
+    """
+    # Filtra em Python só as linhas candidatas; o parse fica num str.extract
+    lines = []
     for msg in messages:
-        text = _get_text_from_msg(msg)
-        if not text:
-            continue
-        one_line = " ".join(text.splitlines()).strip()
-        m = RESOLVED_RE.match(one_line)
-        if m:
-            try:
-                sup = m.group("sup") or ""
-                gale_level = _sup_to_level(sup)
-                pair = m.group("pair").strip()
-                time = m.group("time").strip()
-                tf = m.group("tf").strip()
-                direction = m.group("dir").strip()
-                
-                if "r" in m.groupdict():
-                    result_raw = m.group("r").strip().upper()
-                else:
-                    result_raw = m.groups()[-1].strip().upper()
-                    
-                result = "DOJI" if result_raw == "DOJI" else ("WIN" if result_raw == "WIN" else "LOSS")
-                
-                records.append({
-                    "pair": pair,
-                    "time": time,
-                    "tf": tf,
-                    "direction": direction,
-                    "result": result,
-                    "gale_level": gale_level,
-                })
-            except:
+        # Caminho rápido: exports do Telegram trazem o texto em "text"
+        text = msg.get("text")
+        if not isinstance(text, str) or not text or text.isspace():
+            text = _get_text_from_msg(msg)
+            if not text:
                 continue
-                
-    return records
+        if "\n" in text or "\r" in text:
+            text = " ".join(text.splitlines())
+        line = text.strip()
+        # Descarta sem regex tudo que não começa com o emoji de resultado
+        if line.startswith(RESULT_CHECKS):
+            lines.append(line.upper())
+
+    ex = pd.Series(lines, dtype=object).str.extract(RESOLVED_RE)
+    return ex[ex["pair"].notna()].reset_index(drop=True)
+
+def _extract_records(messages: List[dict]) -> pd.DataFrame:
+    ex = _parse_resolved(messages)
+    return pd.DataFrame({
+        "pair": pd.Categorical(ex["pair"]),
+        "time": ex["time"],
+        "tf": pd.Categorical(ex["tf"]),
+        "direction": pd.Categorical(ex["dir"].str.lower()),
+        "result": pd.Categorical(ex["r"], categories=RESULT_CATEGORIES),
+        "gale_level": ex["sup"].map(SUPERSCRIPT_MAP).fillna(0).astype(np.int8),
+    })
+
+def _extract_arrays(messages: List[dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Só o necessário para as métricas: nível de gale (int8) e código do resultado.
+    """
+    ex = _parse_resolved(messages)
+    gale_levels = ex["sup"].map(SUPERSCRIPT_MAP).fillna(0).to_numpy(dtype=np.int8)
+    result_codes = pd.Categorical(ex["r"], categories=RESULT_CATEGORIES).codes
+    return gale_levels, result_codes
+
+def _count_matrix(gale_levels: np.ndarray, result_codes: np.ndarray) -> np.ndarray:
+    """
+    Conta operações por nível de gale (0-3) x resultado (WIN, LOSS, DOJI) numa única passada.
+    """
+    n_res = len(RESULT_CATEGORIES)
+    key = gale_levels.astype(np.intp) * n_res + result_codes
+    return np.bincount(key, minlength=4 * n_res).reshape(4, n_res)
 
-def render_from_json(json_data: dict):
+@st.cache_data(show_spinner=False)
+def _build_counts(fingerprint: tuple, _messages: List[dict]) -> np.ndarray:
+    """
+    Extrai os registros e monta a matriz de contagens uma única vez por conjunto de mensagens.
+    """
+    return _count_matrix(*_extract_arrays(_messages))
+
+def render_from_json(json_data: dict, fingerprint: tuple = None):
     """
     Renderiza a página de Análise de Gales a partir do JSON.
+    `fingerprint` é a chave do cache já calculada pelo app (se ausente, é calculada aqui).
     """
     messages = json_data.get("messages", [])
-    records = _extract_records(messages)
-    df = pd.DataFrame(records)
+    if not messages:
+        st.warning("⚠️ Nenhum dado disponível para análise de gales.")
+        return
 
-    if df.empty:
+    # Matriz nível de gale x resultado; todas as métricas saem dela
+    counts = _build_counts(fingerprint or messages_fingerprint(messages), messages)
+    total_ops = int(counts.sum())
+    if total_ops == 0:
         st.warning("⚠️ Nenhum dado disponível para análise de gales.")
         return
 
     # ===== CÁLCULOS DE MÉTRICAS =====
-    total_ops = len(df)
-    
+
     # Operações por nível de gale
-    g0_ops = df[df["gale_level"] == 0]
-    g1_ops = df[df["gale_level"] == 1]
-    g2_ops = df[df["gale_level"] == 2]
-    
-    total_g0 = len(g0_ops)
-    total_g1 = len(g1_ops)
-    total_g2 = len(g2_ops)
-    
+    total_g0, total_g1, total_g2 = (int(x) for x in counts[:3].sum(axis=1))
+
     pct_g0 = (total_g0 / total_ops * 100) if total_ops > 0 else 0
     pct_g1 = (total_g1 / total_ops * 100) if total_ops > 0 else 0
     pct_g2 = (total_g2 / total_ops * 100) if total_ops > 0 else 0
-    
+
     # Win rates por nível
-    wins_g0 = len(g0_ops[g0_ops["result"] == "WIN"])
-    wins_g1 = len(g1_ops[g1_ops["result"] == "WIN"])
-    wins_g2 = len(g2_ops[g2_ops["result"] == "WIN"])
-    
-    losses_g0 = len(g0_ops[g0_ops["result"] == "LOSS"])
-    losses_g1 = len(g1_ops[g1_ops["result"] == "LOSS"])
-    losses_g2 = len(g2_ops[g2_ops["result"] == "LOSS"])
-    
+    wins_g0, wins_g1, wins_g2 = (int(x) for x in counts[:3, 0])
+    losses_g0, losses_g1, losses_g2 = (int(x) for x in counts[:3, 1])
+
     wr_g0 = (wins_g0 / (wins_g0 + losses_g0) * 100) if (wins_g0 + losses_g0) > 0 else 0
     wr_g1 = (wins_g1 / (wins_g1 + losses_g1) * 100) if (wins_g1 + losses_g1) > 0 else 0
     wr_g2 = (wins_g2 / (wins_g2 + losses_g2) * 100) if (wins_g2 + losses_g2) > 0 else 0
-    
+
     # Win rate combinado (com gale 1)
-    ops_ate_g1 = df[df["gale_level"] <= 1]
-    wins_ate_g1 = len(ops_ate_g1[ops_ate_g1["result"] == "WIN"])
-    losses_ate_g1 = len(ops_ate_g1[ops_ate_g1["result"] == "LOSS"])
+    wins_ate_g1 = int(counts[:2, 0].sum())
+    losses_ate_g1 = int(counts[:2, 1].sum())
     wr_com_g1 = (wins_ate_g1 / (wins_ate_g1 + losses_ate_g1) * 100) if (wins_ate_g1 + losses_ate_g1) > 0 else 0
-    
+
     # Win rate combinado (com gale 1+2)
-    wins_total = len(df[df["result"] == "WIN"])
-    losses_total = len(df[df["result"] == "LOSS"])
+    wins_total = int(counts[:, 0].sum())
+    losses_total = int(counts[:, 1].sum())
     wr_com_g1_g2 = (wins_total / (wins_total + losses_total) * 100) if (wins_total + losses_total) > 0 else 0
     
     # Taxa de recuperação (% de wins após ir para gale)
@@ -139,174 +233,76 @@ def render_from_json(json_data: dict):
     # Cards principais - Distribuição de Gales
     st.markdown("### 📊 Distribuição de Operações por Nível")
     
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #0b8043 0%, #12b35a 100%); 
-                    border-radius: 12px; padding: 24px; color: white; text-align: center;">
-            <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">SEM GALE (G0)</div>
-            <div style="font-size: 36px; font-weight: 700; margin: 8px 0;">{total_g0:,}</div>
-            <div style="font-size: 18px; font-weight: 600; margin-bottom: 8px;">{pct_g0:.2f}%</div>
-            <div style="font-size: 12px; opacity: 0.8;">do total de operações</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #1a73e8 0%, #4285f4 100%); 
-                    border-radius: 12px; padding: 24px; color: white; text-align: center;">
-            <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">GALE 1 (G1)</div>
-            <div style="font-size: 36px; font-weight: 700; margin: 8px 0;">{total_g1:,}</div>
-            <div style="font-size: 18px; font-weight: 600; margin-bottom: 8px;">{pct_g1:.2f}%</div>
-            <div style="font-size: 12px; opacity: 0.8;">precisaram de gale 1</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #f9ab00 0%, #fbc02d 100%); 
-                    border-radius: 12px; padding: 24px; color: white; text-align: center;">
-            <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">GALE 2 (G2)</div>
-            <div style="font-size: 36px; font-weight: 700; margin: 8px 0;">{total_g2:,}</div>
-            <div style="font-size: 18px; font-weight: 600; margin-bottom: 8px;">{pct_g2:.2f}%</div>
-            <div style="font-size: 12px; opacity: 0.8;">precisaram de gale 2</div>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(_cards_row(
+        _CARD_DIST_TMPL.format(
+            c1="#0b8043", c2="#12b35a", label="SEM GALE (G0)",
+            val=total_g0, pct=pct_g0, footer="do total de operações",
+        ),
+        _CARD_DIST_TMPL.format(
+            c1="#1a73e8", c2="#4285f4", label="GALE 1 (G1)",
+            val=total_g1, pct=pct_g1, footer="precisaram de gale 1",
+        ),
+        _CARD_DIST_TMPL.format(
+            c1="#f9ab00", c2="#fbc02d", label="GALE 2 (G2)",
+            val=total_g2, pct=pct_g2, footer="precisaram de gale 2",
+        ),
+    ), unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
     # Win Rates por cenário
     st.markdown("### 📈 Win Rate por Cenário")
     
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        color_g0 = "#0b8043" if wr_g0 >= 80 else "#f9ab00" if wr_g0 >= 70 else "#d93025"
-        st.markdown(f"""
-        <div style="background: white; border-left: 4px solid {color_g0}; 
-                    border-radius: 8px; padding: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-            <div style="font-size: 13px; color: #666; font-weight: 600; margin-bottom: 8px;">
-                🎯 SEM GALES
-            </div>
-            <div style="font-size: 32px; font-weight: 700; color: {color_g0};">
-                {wr_g0:.2f}%
-            </div>
-            <div style="font-size: 13px; color: #666; margin-top: 8px;">
-                {wins_g0:,} wins / {losses_g0:,} losses
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        color_g1 = "#0b8043" if wr_com_g1 >= 90 else "#1a73e8" if wr_com_g1 >= 85 else "#f9ab00"
-        st.markdown(f"""
-        <div style="background: white; border-left: 4px solid {color_g1}; 
-                    border-radius: 8px; padding: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-            <div style="font-size: 13px; color: #666; font-weight: 600; margin-bottom: 8px;">
-                🔄 COM GALE 1
-            </div>
-            <div style="font-size: 32px; font-weight: 700; color: {color_g1};">
-                {wr_com_g1:.2f}%
-            </div>
-            <div style="font-size: 13px; color: #666; margin-top: 8px;">
-                Incluindo recuperação
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        color_g2 = "#0b8043" if wr_com_g1_g2 >= 90 else "#1a73e8" if wr_com_g1_g2 >= 85 else "#f9ab00"
-        st.markdown(f"""
-        <div style="background: white; border-left: 4px solid {color_g2}; 
-                    border-radius: 8px; padding: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-            <div style="font-size: 13px; color: #666; font-weight: 600; margin-bottom: 8px;">
-                🔄🔄 COM GALE 1+2
-            </div>
-            <div style="font-size: 32px; font-weight: 700; color: {color_g2};">
-                {wr_com_g1_g2:.2f}%
-            </div>
-            <div style="font-size: 13px; color: #666; margin-top: 8px;">
-                Recuperação completa
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    color_g0 = "#0b8043" if wr_g0 >= 80 else "#f9ab00" if wr_g0 >= 70 else "#d93025"
+    color_g1 = "#0b8043" if wr_com_g1 >= 90 else "#1a73e8" if wr_com_g1 >= 85 else "#f9ab00"
+    color_g2 = "#0b8043" if wr_com_g1_g2 >= 90 else "#1a73e8" if wr_com_g1_g2 >= 85 else "#f9ab00"
+    st.markdown(_cards_row(
+        _CARD_WR_TMPL.format(
+            color=color_g0, label="🎯 SEM GALES", wr=wr_g0,
+            footer=f"{wins_g0:,} wins / {losses_g0:,} losses",
+        ),
+        _CARD_WR_TMPL.format(
+            color=color_g1, label="🔄 COM GALE 1", wr=wr_com_g1,
+            footer="Incluindo recuperação",
+        ),
+        _CARD_WR_TMPL.format(
+            color=color_g2, label="🔄🔄 COM GALE 1+2", wr=wr_com_g1_g2,
+            footer="Recuperação completa",
+        ),
+    ), unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
     # Taxa de Recuperação
     st.markdown("### 🔄 Taxa de Recuperação dos Gales")
     
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                    border-radius: 12px; padding: 24px; color: white;">
-            <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">RECUPERAÇÃO GALE 1</div>
-            <div style="font-size: 42px; font-weight: 700; margin: 12px 0;">{taxa_recup_g1:.1f}%</div>
-            <div style="font-size: 14px; opacity: 0.9;">
-                {wins_g1:,} vitórias de {total_g1:,} tentativas
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                    border-radius: 12px; padding: 24px; color: white;">
-            <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">RECUPERAÇÃO GALE 2</div>
-            <div style="font-size: 42px; font-weight: 700; margin: 12px 0;">{taxa_recup_g2:.1f}%</div>
-            <div style="font-size: 14px; opacity: 0.9;">
-                {wins_g2:,} vitórias de {total_g2:,} tentativas
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(_cards_row(
+        _CARD_RECUP_TMPL.format(
+            label="RECUPERAÇÃO GALE 1", taxa=taxa_recup_g1, wins=wins_g1, total=total_g1,
+        ),
+        _CARD_RECUP_TMPL.format(
+            label="RECUPERAÇÃO GALE 2", taxa=taxa_recup_g2, wins=wins_g2, total=total_g2,
+        ),
+    ), unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
     # Falhas
     st.markdown("### ⚠️ Falhas Mesmo com Gales")
     
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown(f"""
-        <div style="background: #fce4ec; border-left: 4px solid #d93025; 
-                    border-radius: 8px; padding: 16px;">
-            <div style="font-size: 13px; color: #666; font-weight: 600;">Falhas no G1</div>
-            <div style="font-size: 28px; font-weight: 700; color: #d93025; margin: 8px 0;">
-                {falhas_g1:,}
-            </div>
-            <div style="font-size: 12px; color: #666;">operações perdidas</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div style="background: #fce4ec; border-left: 4px solid #d93025; 
-                    border-radius: 8px; padding: 16px;">
-            <div style="font-size: 13px; color: #666; font-weight: 600;">Falhas no G2</div>
-            <div style="font-size: 28px; font-weight: 700; color: #d93025; margin: 8px 0;">
-                {falhas_g2:,}
-            </div>
-            <div style="font-size: 12px; color: #666;">operações perdidas</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        total_falhas = falhas_g1 + falhas_g2
-        pct_falhas = (total_falhas / total_ops * 100) if total_ops > 0 else 0
-        st.markdown(f"""
-        <div style="background: #fce4ec; border-left: 4px solid #d93025; 
-                    border-radius: 8px; padding: 16px;">
-            <div style="font-size: 13px; color: #666; font-weight: 600;">Total de Falhas</div>
-            <div style="font-size: 28px; font-weight: 700; color: #d93025; margin: 8px 0;">
-                {total_falhas:,}
-            </div>
-            <div style="font-size: 12px; color: #666;">{pct_falhas:.2f}% do total</div>
-        </div>
-        """, unsafe_allow_html=True)
+    total_falhas = falhas_g1 + falhas_g2
+    pct_falhas = (total_falhas / total_ops * 100) if total_ops > 0 else 0
+    st.markdown(_cards_row(
+        _CARD_FALHA_TMPL.format(
+            label="Falhas no G1", val=falhas_g1, footer="operações perdidas",
+        ),
+        _CARD_FALHA_TMPL.format(
+            label="Falhas no G2", val=falhas_g2, footer="operações perdidas",
+        ),
+        _CARD_FALHA_TMPL.format(
+            label="Total de Falhas", val=total_falhas, footer=f"{pct_falhas:.2f}% do total",
+        ),
+    ), unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
@@ -333,36 +329,8 @@ def render_from_json(json_data: dict):
         ["Falhas mesmo com Gale 2", f"{falhas_g2:,}", "❌"],
     ]
     
-    df_metrics = pd.DataFrame(metrics_data, columns=["Métrica", "Valor", "Indicador"])
-    
-    st.markdown("""
-    <style>
-    .metrics-table {
-        border-collapse: collapse;
-        width: 100%;
-        font-family: "Inter", "Arial", sans-serif;
-    }
-    .metrics-table th {
-        background-color: #f7f9fc;
-        color: #333;
-        padding: 12px;
-        text-align: left;
-        font-weight: 600;
-        border-bottom: 2px solid #e6eef6;
-    }
-    .metrics-table td {
-        padding: 10px 12px;
-        border-top: 1px solid #f0f4f8;
-        color: #333;
-    }
-    .metrics-table tr:hover {
-        background-color: #f8f9fa;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
-    html_table = df_metrics.to_html(index=False, escape=False, classes="metrics-table")
-    st.markdown(f'<div style="overflow-x: auto; padding: 10px; background: #ffffff; border-radius: 8px; border: 1px solid #eef2f6;">{html_table}</div>', unsafe_allow_html=True)
+    html_metrics = html_table("metrics-table", ["Métrica", "Valor", "Indicador"], metrics_data)
+    st.markdown(_METRICS_CSS + f'<div style="overflow-x: auto; padding: 10px; background: #ffffff; border-radius: 8px; border: 1px solid #eef2f6;">{html_metrics}</div>', unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
@@ -375,9 +343,7 @@ def render_from_json(json_data: dict):
         ["C - Com Gale 2", f"{total_g2:,}", f"{wins_g2:,}", f"{losses_g2:,}", f"{wr_g2:.2f}%"],
     ]
     
-    df_cenarios = pd.DataFrame(cenarios_data, columns=["Cenário", "Total Ops", "WIN", "LOSS", "Win Rate"])
-    
-    html_cenarios = df_cenarios.to_html(index=False, escape=False, classes="metrics-table")
+    html_cenarios = html_table("metrics-table", ["Cenário", "Total Ops", "WIN", "LOSS", "Win Rate"], cenarios_data)
     st.markdown(f'<div style="overflow-x: auto; padding: 10px; background: #ffffff; border-radius: 8px; border: 1px solid #eef2f6;">{html_cenarios}</div>', unsafe_allow_html=True)
 
     # Insights
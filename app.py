@@ -1,12 +1,15 @@
 # app.py
-import json
 import re
 from datetime import datetime, timedelta, date
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
+import numpy as np
+import orjson
 import pandas as pd
 import streamlit as st
 
+from comum import NL_TRANS, messages_fingerprint
 from resumo_executivo import build_all_sheets
 import qualidade_sala  # qualidade_sala.py (tem render_from_json)
 import validacao_horarios  # validacao_horarios.py (análise de horários)
@@ -17,23 +20,14 @@ import gestao_risco  # integração solicitada
 
 # ----- PARSER / EXTRAÇÃO ----------------------------------------------------
 
-SUPERSCRIPT_MAP = {
-    "\u00b9": 1,  # ¹
-    "\u00b2": 2,  # ²
-    "\u00b3": 3,  # ³
-    "1": 1,
-    "2": 2,
-    "3": 3,
-}
-
-def sup_to_level(s: str) -> int:
-    if not s:
-        return 0
-    return SUPERSCRIPT_MAP.get(s, 0)
+# Sobrescrito do emoji -> dígito do nível de gale (aplicado na coluna inteira com str.translate)
+SUP_TRANS = str.maketrans({"\u00b9": "1", "\u00b2": "2", "\u00b3": "3"})  # ¹ ² ³
+GALE_DIGITS = ["1", "2", "3"]
 
 def load_json(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # orjson direto: um cache_data aqui teria de hashear os bytes e desserializar uma cópia a cada rerun
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
 
 def try_parse_iso_date(s):
     """Tenta converter várias formas comuns de data para datetime.date.
@@ -45,13 +39,26 @@ def try_parse_iso_date(s):
         return s
     if isinstance(s, datetime):
         return s.date()
+    return _parse_date_str(str(s).strip())
 
-    s2 = str(s).strip()
+@lru_cache(maxsize=4096)
+def _parse_date_str(s2: str):
+    # caminhos rápidos pela posição dos separadores (exports repetem os mesmos formatos)
+    if len(s2) >= 10 and s2[4] == "-" and s2[7] == "-":
+        try:
+            return datetime.fromisoformat(s2).date()
+        except ValueError:
+            pass
+    elif len(s2) == 10 and s2[2] == "/" and s2[5] == "/":
+        dmy = s2[:2] + s2[3:5] + s2[6:]
+        if dmy.isascii() and dmy.isdigit():
+            try:
+                return date(int(s2[6:]), int(s2[3:5]), int(s2[:2]))
+            except ValueError:
+                return None
 
     # unix timestamp numérico (segundos ou milissegundos)
-    # tenta extrair somente dígitos contíguos (remove possíveis espaços)
-    digits = re.sub(r"\D", "", s2)
-    if digits and digits == s2:
+    if s2.isdecimal():
         try:
             n = int(s2)
             # detectar ms vs s (se maior que ~1e12 provavelmente ms)
@@ -76,15 +83,68 @@ def try_parse_iso_date(s):
     except:
         return None
 
+ATIVO_RE = re.compile(r"Ativo:\s*([A-Z0-9\-\_]+(?:-OTC)?)", re.IGNORECASE)
+HORARIO_RE = re.compile(r"Hor[aá]rio:\s*(\d{2}:\d{2}:\d{2})", re.IGNORECASE)
+PAYOUT_RE = re.compile(r"Payout:\s*([\d\.]+)\s*%", re.IGNORECASE)
+
+# Chaves onde a data pode estar, na ordem de preferência
+DATE_KEYS = ("date", "message.date", "message.date_unixtime", "message.date_unixtime_str")
+
+def msg_date_raw(m: dict):
+    """Primeiro valor não nulo entre as chaves de data (ou None)."""
+    for key in DATE_KEYS:
+        v = m.get(key)
+        if v is not None:
+            return v
+    return None
+
+def msg_date(m: dict):
+    """Data da mensagem; se a chave de data não parsear, tenta extrair do texto."""
+    d = try_parse_iso_date(msg_date_raw(m))
+    if d is None:
+        d = try_parse_iso_date(m.get("text") or m.get("message") or "")
+    return d
+
+def parse_message_dates(messages: List[dict]) -> np.ndarray:
+    """Data de cada mensagem como datetime64[D] (NaT quando não houver data válida).
+       As strings ISO são convertidas de uma vez com pandas; o resto cai no try_parse_iso_date."""
+    raw = [msg_date_raw(m) for m in messages]
+
+    try:
+        parsed = pd.to_datetime(pd.Series(raw, dtype=object), format="ISO8601", errors="coerce")
+        if parsed.dt.tz is not None:
+            parsed = parsed.dt.tz_localize(None)
+        out = parsed.to_numpy(dtype="datetime64[D]")
+    except (ValueError, TypeError):
+        # fusos misturados ou tipos inesperados: tudo pelo caminho lento
+        out = np.full(len(raw), np.datetime64("NaT"), dtype="datetime64[D]")
+
+    for i in np.flatnonzero(np.isnat(out)):
+        d = msg_date(messages[i])
+        if d is not None:
+            out[i] = np.datetime64(d, "D")
+    return out
+
+def filter_messages_by_date(messages: List[dict], dates: np.ndarray, start: date, end: date) -> List[dict]:
+    """Mensagens com data em [start, end]; mensagens sem data válida ficam de fora."""
+    lo_d, hi_d = np.datetime64(start, "D"), np.datetime64(end, "D")
+    # Export em ordem cronológica (o caso comum): a janela é uma fatia contígua
+    if len(dates) and not np.isnat(dates).any() and (dates[1:] >= dates[:-1]).all():
+        lo = int(np.searchsorted(dates, lo_d, side="left"))
+        hi = int(np.searchsorted(dates, hi_d, side="right"))
+        return messages[lo:hi]
+    mask = (dates >= lo_d) & (dates <= hi_d)
+    return [messages[i] for i in np.flatnonzero(mask)]
+
 def parse_signal_block(text: str) -> dict:
     res = {}
-    m = re.search(r"Ativo:\s*([A-Z0-9\-\_]+(?:-OTC)?)", text, re.IGNORECASE)
+    m = ATIVO_RE.search(text)
     if m:
         res["pair"] = m.group(1).strip()
-    m = re.search(r"Hor[aá]rio:\s*(\d{2}:\d{2}:\d{2})", text, re.IGNORECASE)
+    m = HORARIO_RE.search(text)
     if m:
         res["time"] = m.group(1)
-    m = re.search(r"Payout:\s*([\d\.]+)\s*%", text, re.IGNORECASE)
+    m = PAYOUT_RE.search(text)
     if m:
         try:
             res["payout"] = float(m.group(1)) / 100.0
@@ -98,78 +158,90 @@ RESOLVED_RE = re.compile(
     flags=re.IGNORECASE,
 )
 
-def extract_records(messages: List[dict]) -> Tuple[List[dict], Dict[Tuple[str,str], float]]:
-    signals = {}
-    resolved = []
-    for msg in messages:
+# Primeiro caractere possível de uma linha resolvida (filtro barato antes da regex)
+RESOLVED_CHECKS = ("✅", "❌", "🃏")
+
+RECORD_COLUMNS = ["pair", "time", "hour", "tf", "direction", "result", "gale_level", "payout", "msg_date"]
+
+def extract_records(messages: List[dict]) -> Tuple[pd.DataFrame, Dict[Tuple[str,str], float]]:
+    signal_rows = []   # (posição, par, horário, payout) na ordem das mensagens
+    lines, line_pos = [], []
+    for pos, msg in enumerate(messages):
         text = msg.get("text", "")
-        if isinstance(text, list):
-            text = "".join([t.get("text", "") if isinstance(t, dict) else str(t) for t in text])
+        if type(text) is list:
+            text = "".join([t.get("text", "") if type(t) is dict else str(t) for t in text])
 
         if "Ativo:" in text or "Payout:" in text:
             blk = parse_signal_block(text)
             if "pair" in blk and "time" in blk and "payout" in blk:
-                signals[(blk["pair"], blk["time"])] = blk["payout"]
-
-        one_line = " ".join(str(text).splitlines()).strip()
-        m = RESOLVED_RE.match(one_line)
-        if m:
-            sup = m.group("sup") or ""
-            gale_level = sup_to_level(sup)
-            pair = m.group("pair").strip()
-            time = m.group("time").strip()
-            tf = m.group("tf").strip()
-            direction = m.group("dir").strip()
-            result_raw = m.group("result").strip().upper()
-            result = "DOJI" if result_raw == "DOJI" else ("WIN" if result_raw == "WIN" else ("LOSS" if result_raw == "LOSS" else result_raw))
-            payout = signals.get((pair, time), None)
-
-            msg_date = None
-            # tenta várias chaves para achar a data no próprio registro
-            for key in ("date", "message.date", "message.date_unixtime", "message.date_unixtime_str"):
-                if key in msg and msg.get(key) is not None:
-                    msg_date = try_parse_iso_date(msg.get(key))
-                    break
-            if msg_date is None:
-                # tenta extrair do texto se possível
-                msg_date = try_parse_iso_date(msg.get("text") or msg.get("message") or "")
-
-            resolved.append({
-                "pair": pair,
-                "time": time,
-                "hour": int(time.split(":")[0]) if time else None,
-                "tf": tf,
-                "direction": direction,
-                "result": result,
-                "gale_level": gale_level,
-                "payout": payout,
-                "msg_date": msg_date
-            })
-    return resolved, signals
+                signal_rows.append((pos, blk["pair"], blk["time"], blk["payout"]))
+
+        # strip antes do translate: só as linhas candidatas pagam a troca das quebras
+        one_line = (text if type(text) is str else str(text)).strip()
+        if one_line.startswith(RESOLVED_CHECKS):
+            lines.append(one_line.translate(NL_TRANS))
+            line_pos.append(pos)
+
+    sig_df = pd.DataFrame(signal_rows, columns=["pos", "pair", "time", "payout"]).astype(
+        {"pos": np.int64, "pair": object, "time": object}
+    )
+    # último payout por (par, horário), como no dicionário montado mensagem a mensagem
+    signals = dict(zip(zip(sig_df["pair"], sig_df["time"]), sig_df["payout"]))
+
+    # Parse de todas as linhas candidatas num único str.extract
+    ex = pd.Series(lines, dtype=object).str.extract(RESOLVED_RE)
+    ex["pos"] = np.asarray(line_pos, dtype=np.int64)
+    ex = ex[ex["pair"].notna()].reset_index(drop=True)
+    if ex.empty:
+        return pd.DataFrame(columns=RECORD_COLUMNS), signals
+
+    # "" (sem gale) ou qualquer outro dígito casado pelo \d vira nível 0
+    gale_digits = ex["sup"].str.translate(SUP_TRANS)
+    df = pd.DataFrame({
+        "pos": ex["pos"],
+        "pair": ex["pair"],
+        "time": ex["time"],
+        "hour": ex["time"].str.slice(0, 2).astype(np.int8),
+        "tf": ex["tf"].astype("category"),
+        "direction": ex["dir"].astype("category"),
+        "result": ex["result"].str.upper().astype("category"),
+        "gale_level": gale_digits.where(gale_digits.isin(GALE_DIGITS), "0").astype(np.int8),
+    })
+
+    # Payout = último sinal (par, horário) visto até a mensagem resolvida (hash-join ordenado)
+    df = pd.merge_asof(df, sig_df, on="pos", by=["pair", "time"], direction="backward")
+    # par vira categoria só depois do merge (as chaves do join precisam ser do mesmo tipo);
+    # categorias na ordem de aparição para o value_counts desempatar como antes.
+    # payout continua float64 (NaN = sem sinal) para não perder precisão no lucro
+    df["pair"] = pd.Categorical(df["pair"], categories=pd.unique(df["pair"]))
+
+    df["msg_date"] = [msg_date(messages[pos]) for pos in df["pos"]]
+
+    return df[RECORD_COLUMNS], signals
 
 # ----- METRICAS / ESTIMATIVAS -----------------------------------------------
 
-def compute_profit_for_record(rec: dict, stakes: List[float], default_payout: float = 0.85) -> float:
-    payout = rec.get("payout") or default_payout
-    level = rec.get("gale_level", 0)
-    result = rec.get("result", "").upper()
-    level = min(level, len(stakes)-1)
-
-    if result == "DOJI":
-        return 0.0
-    if result == "WIN":
-        if level == 0:
-            return stakes[0] * payout
-        else:
-            lost = sum(stakes[:level])
-            win_amount = stakes[level] * payout
-            return -lost + win_amount
-    if result == "LOSS":
-        lost = sum(stakes[:level+1])
-        return -lost
-    return 0.0
-
-def summarize_resolved(resolved: List[dict], stakes: List[float], default_payout: float = 0.85):
+def compute_profits(df: pd.DataFrame, stakes: List[float], default_payout: float = 0.85) -> np.ndarray:
+    """Lucro de cada operação (vetorizado): WIN paga a entrada do nível menos os gales perdidos,
+       LOSS perde todas as entradas até o nível, DOJI devolve a entrada."""
+    stakes_arr = np.asarray(stakes, dtype=float)
+    # cum[n] = soma das n primeiras entradas
+    cum = np.concatenate(([0.0], np.cumsum(stakes_arr)))
+    levels = np.minimum(df["gale_level"].to_numpy(dtype=int), len(stakes_arr) - 1)
+    payouts = pd.to_numeric(df["payout"], errors="coerce").to_numpy(dtype=float)
+    if np.isnan(payouts).all():
+        # nenhuma operação casou com sinal: todas usam o payout padrão
+        payouts = np.full(len(payouts), default_payout)
+    else:
+        # payout 0 usa o padrão; sem sinal (NaN) deixa o WIN em NaN, fora do total (nansum)
+        payouts = np.where(payouts == 0, default_payout, payouts)
+    results = df["result"].astype(str).str.upper().to_numpy()
+
+    win_profit = stakes_arr[levels] * payouts - cum[levels]
+    loss_profit = -cum[levels + 1]
+    return np.where(results == "WIN", win_profit, np.where(results == "LOSS", loss_profit, 0.0))
+
+def summarize_resolved(resolved: pd.DataFrame, stakes: List[float], default_payout: float = 0.85):
     df = pd.DataFrame(resolved)
     if df.empty:
         return {}
@@ -188,11 +260,17 @@ def summarize_resolved(resolved: List[dict], stakes: List[float], default_payout
     g2 = g_counts.get(2, 0)
 
     pair_counts = df["pair"].value_counts()
-    top_pairs = pair_counts.index.tolist()[:12]
-
-    hourly = df.groupby("hour").agg(
+    top_pairs = pair_counts.index[:12].tolist()
+    # Ranking das 30 paridades mais operadas, já com a participação calculada
+    pair_top30 = pd.DataFrame({
+        "Paridade": pair_counts.index[:30].astype(str),
+        "Operações": pair_counts.to_numpy()[:30],
+        "Participação %": pair_counts.to_numpy()[:30] / pair_counts.sum() * 100,
+    })
+
+    hourly = df.assign(is_win=df["result"].to_numpy() == "WIN").groupby("hour", sort=True).agg(
         total=("result", "size"),
-        wins=("result", lambda s: (s == "WIN").sum())
+        wins=("is_win", "sum")
     ).reset_index()
     hourly["win_rate"] = 100.0 * hourly["wins"] / hourly["total"]
     min_sample = max(10, int(0.005 * total_ops))
@@ -203,8 +281,8 @@ def summarize_resolved(resolved: List[dict], stakes: List[float], default_payout
     top_hours = good_hours.head(7).sort_values("hour")
     horarios_list = [f"{int(r['hour']):02d}:00-{int(r['hour'])+1:02d}:00" for _, r in top_hours.iterrows()]
 
-    profits = df.apply(lambda r: compute_profit_for_record(r.to_dict(), stakes, default_payout), axis=1)
-    total_profit = profits.sum()
+    profits = compute_profits(df, stakes, default_payout)
+    total_profit = np.nansum(profits)
 
     summary = {
         "total_ops": total_ops,
@@ -219,7 +297,7 @@ def summarize_resolved(resolved: List[dict], stakes: List[float], default_payout
         "horarios": horarios_list,
         "total_profit": float(total_profit),
         "hourly_table": hourly.sort_values("hour").reset_index(drop=True),
-        "pair_counts": pair_counts
+        "pair_counts_top30": pair_top30
     }
     return summary
 
@@ -240,21 +318,10 @@ def build_resumo_params_from_json(json_data: dict, stakes: List[float] = [2.0, 4
         }
         return resumo_empty, summary
 
-    # coletar datas como objetos date e contar dias (para projeção)
-    dates = set()
-    for m in messages:
-        # tenta chaves alternativas
-        candidate = None
-        for key in ("date", "message.date", "message.date_unixtime", "message.date_unixtime_str"):
-            if key in m and m.get(key) is not None:
-                candidate = try_parse_iso_date(m.get(key))
-                break
-        if candidate is None:
-            candidate = try_parse_iso_date(m.get("text") or m.get("message") or "")
-        if candidate:
-            dates.add(candidate)
-
-    n_days = max(1, len(dates))
+    # dias distintos com mensagens (para projeção), direto do array datetime64
+    dates_np = parse_message_dates(messages)
+    unique_days = np.unique(dates_np[~np.isnat(dates_np)])
+    n_days = max(1, unique_days.size)
 
     # cálculo de projeções (mantido)
     daily_profit = summary["total_profit"] / n_days if n_days > 0 else 0.0
@@ -263,7 +330,7 @@ def build_resumo_params_from_json(json_data: dict, stakes: List[float] = [2.0, 4
     meta_dia = round(daily_profit) if abs(daily_profit) >= 1 else 15
 
     # formata o mês/última data como dd/mm/yyyy
-    mes_display = max(dates).strftime("%d/%m/%Y") if dates else "Periodo"
+    mes_display = unique_days[-1].item().strftime("%d/%m/%Y") if unique_days.size else "Periodo"
 
     resumo_params = {
         "mes": mes_display,
@@ -280,6 +347,28 @@ def build_resumo_params_from_json(json_data: dict, stakes: List[float] = [2.0, 4
     }
     return resumo_params, summary
 
+@st.cache_data(show_spinner=False)
+def message_dates_cached(fingerprint: tuple, _messages: List[dict]) -> np.ndarray:
+    """Datas das mensagens parseadas uma única vez por arquivo."""
+    return parse_message_dates(_messages)
+
+@st.cache_data(show_spinner=False)
+def build_resumo_cached(fingerprint: tuple, _json_data: dict) -> Tuple[Dict, dict]:
+    """Extração + resumo calculados uma vez por conjunto de mensagens (reruns vêm do cache)."""
+    return build_resumo_params_from_json(_json_data)
+
+def resumo_params_key(resumo_params: dict) -> tuple:
+    """Versão hashable dos parâmetros do resumo (listas viram tuplas), usada como chave de cache."""
+    return tuple(sorted(
+        ((k, tuple(v) if isinstance(v, list) else v) for k, v in resumo_params.items()),
+        key=lambda kv: kv[0],
+    ))
+
+@st.cache_data(show_spinner=False)
+def build_sheets_cached(resumo_key: tuple) -> Dict[str, pd.DataFrame]:
+    """Abas do resumo montadas uma vez por conjunto de parâmetros (troca de página vem do cache)."""
+    return build_all_sheets(dict(resumo_key))
+
 # --------------------------
 # Styling helpers & CSS (injetado uma vez)
 # --------------------------
@@ -353,8 +442,13 @@ span.status-info { color: #0b63c4; font-weight: 700; }   /* azul */
 </style>
 """
 
+@st.cache_data(show_spinner=False)
+def df_to_html(df: pd.DataFrame, index: bool = False) -> str:
+    """HTML da tabela memoizado pelo conteúdo do DataFrame (reruns não refazem o to_html)."""
+    return df.to_html(index=index, classes="styled-table", escape=False)
+
 def render_df_with_scroll(df: pd.DataFrame, index: bool = False):
-    html = df.to_html(index=index, classes="styled-table", escape=False)
+    html = df_to_html(df, index)
     st.markdown(f"<div class='table-container' style='width:100%'>{html}</div>", unsafe_allow_html=True)
 
 # ----- STREAMLIT UI ---------------------------------------------------------
@@ -367,7 +461,7 @@ st.markdown("<h1 style='text-align:center; margin-bottom: 6px;'>Dashboard de An
 # Carregamento de arquivo (mantém igual)
 uploaded = st.file_uploader("Faça upload do result.json (ou deixe em branco para usar o result.json local)", type=["json"])
 if uploaded:
-    data = json.load(uploaded)
+    data = orjson.loads(uploaded.getvalue())
 else:
     try:
         data = load_json("result.json")
@@ -377,30 +471,19 @@ else:
 
 # --- FILTRO DE DATA GLOBAL (Dois date_inputs: Início / Fim) ---
 all_messages = data.get("messages", [])
-all_dates = []
-for m in all_messages:
-    # tenta várias chaves possíveis onde a data pode estar
-    for key in ("date", "message.date", "message.date_unixtime", "message.date_unixtime_str"):
-        if key in m and m.get(key) is not None:
-            d = try_parse_iso_date(m.get(key))
-            if d:
-                all_dates.append(d)
-            break
-    else:
-        # tenta extrair de texto livre (caso haja data embutida)
-        text_field = m.get("text") or m.get("message") or ""
-        d = try_parse_iso_date(text_field)
-        if d:
-            all_dates.append(d)
-
-if all_dates:
-    min_date, max_date = min(all_dates), max(all_dates)
+# chave por conteúdo calculada uma vez por rerun; o recorte por data é chaveado por (arquivo, período)
+all_fingerprint = messages_fingerprint(all_messages)
+msg_dates = message_dates_cached(all_fingerprint, all_messages)
+valid_dates = msg_dates[~np.isnat(msg_dates)]
+has_dates = valid_dates.size > 0
+
+if has_dates:
+    min_date, max_date = valid_dates.min().item(), valid_dates.max().item()
 else:
     min_date = max_date = datetime.now().date()
-    all_dates = []
 
 # Filtragem de mensagens por data (se houver datas válidas)
-if all_dates:
+if has_dates:
     # Valores já definidos dentro a sidebar (serão definidos lá)
     start_f = st.session_state.get("start_date", min_date)
     end_f = st.session_state.get("end_date", max_date)
@@ -410,34 +493,32 @@ if all_dates:
     if isinstance(end_f, datetime):
         end_f = end_f.date()
     
-    # filtra mensagens de forma robusta usando try_parse_iso_date
-    filtered_messages = []
-    for m in all_messages:
-        # tenta várias chaves onde a data pode estar
-        candidate = None
-        for key in ("date", "message.date", "message.date_unixtime", "message.date_unixtime_str"):
-            if key in m and m.get(key) is not None:
-                candidate = try_parse_iso_date(m.get(key))
-                break
-        if candidate is None:
-            # fallback: tenta extrair do texto
-            candidate = try_parse_iso_date(m.get("text") or m.get("message") or "")
-        if candidate is None:
-            # ignora mensagens sem data válida
-            continue
-        if start_f <= candidate <= end_f:
-            filtered_messages.append(m)
+    # filtra com uma máscara sobre as datas já parseadas
+    filtered_messages = filter_messages_by_date(all_messages, msg_dates, start_f, end_f)
     data_filtrada = {"messages": filtered_messages}
+    filtered_period = (start_f, end_f)
+    filtered_fingerprint = (all_fingerprint, start_f, end_f)
 else:
     data_filtrada = data
+    filtered_period = None
+    filtered_fingerprint = all_fingerprint
 
 # Build resumo (USANDO dados filtrados)
-resumo_params, summary = build_resumo_params_from_json(data_filtrada)
+resumo_params, summary = build_resumo_cached(filtered_fingerprint, data_filtrada)
 
 # ---------------------------
 # Funções de renderização por seção
 # ---------------------------
 
+# Status (em maiúsculas) -> classe CSS de destaque nas abas do resumo
+STATUS_CLASSES = {
+    "BOM": "status-good",
+    "SAUDÁVEL": "status-good",
+    "ADEQUADA": "status-good",
+    "VALIDADOS": "status-info",
+    "IDENTIFICADOS": "status-info",
+}
+
 def render_resumo_executivo(resumo_params: dict, summary: dict):
     win_rate_value = resumo_params.get("win_rate")
     win_rate_display = f"{win_rate_value:.2f}%" if isinstance(win_rate_value, (int, float)) else "—"
@@ -492,13 +573,13 @@ def render_resumo_executivo(resumo_params: dict, summary: dict):
         st.write("—")
 
     # integrar com resumo_executivo.py
-    sheets = build_all_sheets(resumo_params)
+    sheets = build_sheets_cached(resumo_params_key(resumo_params))
     tab_names = list(sheets.keys())
     tabs = st.tabs(tab_names)
     for tab, name in zip(tabs, tab_names):
         with tab:
             st.header(name)
-            df_tab = sheets[name].copy()
+            df_tab = sheets[name]
             
             # Tratamento especial para a aba "Resumo Executivo"
             if "resumo" in name.lower() and "executivo" in name.lower():
@@ -556,14 +637,10 @@ def render_resumo_executivo(resumo_params: dict, summary: dict):
             else:
                 # Para outras abas, mantém o estilo de tabela normal
                 if "Status" in df_tab.columns:
-                    def decorate_status(s):
-                        s_upper = str(s).upper()
-                        if s_upper in ["BOM", "SAUDÁVEL", "ADEQUADA"]:
-                            return f"<span class='status-good'>{s}</span>"
-                        if s_upper in ["VALIDADOS", "IDENTIFICADOS"]:
-                            return f"<span class='status-info'>{s}</span>"
-                        return s
-                    df_tab["Status"] = df_tab["Status"].apply(decorate_status)
+                    status = df_tab["Status"].astype(str)
+                    status_cls = status.str.upper().map(STATUS_CLASSES)
+                    decorated = "<span class='" + status_cls + "'>" + status + "</span>"
+                    df_tab = df_tab.assign(Status=decorated.where(status_cls.notna(), df_tab["Status"]))
                 render_df_with_scroll(df_tab, index=False)
 
     st.markdown("---")
@@ -571,13 +648,15 @@ def render_resumo_executivo(resumo_params: dict, summary: dict):
 
     if "hourly_table" in summary and not summary["hourly_table"].empty:
         st.markdown("### ⏰ Performance por Horário")
-        df_hourly = summary["hourly_table"].copy()
+        hourly = summary["hourly_table"]
         
-        # Renomear e formatar colunas
-        df_hourly["Horário"] = df_hourly["hour"].apply(lambda x: f"{int(x):02d}:00 - {int(x)+1:02d}:00")
-        df_hourly["Total de Operações"] = df_hourly["total"]
-        df_hourly["Vitórias"] = df_hourly["wins"]
-        df_hourly["Taxa de Acerto"] = pd.to_numeric(df_hourly["win_rate"], errors="coerce").fillna(0.0).map(lambda x: f"{x:.2f}%")
+        # Monta o frame de exibição direto das colunas do resumo (sem copiar a origem)
+        df_hourly_display = pd.DataFrame({
+            "Horário": [f"{int(x):02d}:00 - {int(x)+1:02d}:00" for x in hourly["hour"]],
+            "Total de Operações": hourly["total"].to_numpy(),
+            "Vitórias": hourly["wins"].to_numpy(),
+            "Taxa de Acerto": pd.to_numeric(hourly["win_rate"], errors="coerce").fillna(0.0).map(lambda x: f"{x:.2f}%").to_numpy(),
+        })
         
         # Adicionar cor baseada na taxa de acerto
         def color_win_rate(val):
@@ -592,41 +671,34 @@ def render_resumo_executivo(resumo_params: dict, summary: dict):
             except:
                 return val
         
-        df_hourly_display = df_hourly[["Horário", "Total de Operações", "Vitórias", "Taxa de Acerto"]].copy()
         df_hourly_display["Taxa de Acerto"] = df_hourly_display["Taxa de Acerto"].apply(color_win_rate)
         
         render_df_with_scroll(df_hourly_display, index=False)
 
-    if "pair_counts" in summary:
+    if "pair_counts_top30" in summary:
         st.markdown("### 💱 Ranking de Paridades")
-        df_pairs = summary["pair_counts"].reset_index()
-        df_pairs.columns = ["Paridade", "Operações"]
-        
-        # Adicionar coluna de porcentagem
-        total = df_pairs["Operações"].sum()
-        df_pairs["Participação %"] = df_pairs["Operações"].apply(lambda x: f"{(x/total*100):.1f}%")
-        
-        # Formatação de números
-        df_pairs["Operações"] = df_pairs["Operações"].apply(lambda x: f"{x:,}")
-        
-        # Adicionar posição/rank
-        df_pairs.insert(0, "Rank", range(1, len(df_pairs) + 1))
+        top30 = summary["pair_counts_top30"]
         
+        # Apenas formatação: contagens e participação já vêm do resumo
+        df_pairs_display = pd.DataFrame({
+            "Rank": np.arange(1, len(top30) + 1),
+            "Paridade": top30["Paridade"].to_numpy(),
+            "Operações": [f"{x:,}" for x in top30["Operações"]],
+            "Participação %": [f"{x:.1f}%" for x in top30["Participação %"]],
+        })
+
         # Destacar top 3
-        def highlight_rank(row):
-            rank = row["Rank"]
-            paridade = row["Paridade"]
-            if rank == 1:
-                return f'<span style="color: #f9ab00; font-weight: 700;">🥇 {paridade}</span>'
-            elif rank == 2:
-                return f'<span style="color: #9aa0a6; font-weight: 700;">🥈 {paridade}</span>'
-            elif rank == 3:
-                return f'<span style="color: #cd7f32; font-weight: 700;">🥉 {paridade}</span>'
-            return paridade
-        
-        df_pairs_display = df_pairs.head(30).copy()
-        df_pairs_display["Paridade"] = df_pairs_display.apply(highlight_rank, axis=1)
-        df_pairs_display = df_pairs_display[["Rank", "Paridade", "Operações", "Participação %"]]
+        rank = df_pairs_display["Rank"].to_numpy()
+        paridade = df_pairs_display["Paridade"].astype(str)
+        df_pairs_display["Paridade"] = np.select(
+            [rank == 1, rank == 2, rank == 3],
+            [
+                '<span style="color: #f9ab00; font-weight: 700;">🥇 ' + paridade + '</span>',
+                '<span style="color: #9aa0a6; font-weight: 700;">🥈 ' + paridade + '</span>',
+                '<span style="color: #cd7f32; font-weight: 700;">🥉 ' + paridade + '</span>',
+            ],
+            default=paridade,
+        )
         
         render_df_with_scroll(df_pairs_display, index=False)
 
@@ -723,7 +795,7 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("### 📅 Filtro de Período")
 
-    if all_dates:
+    if has_dates:
         # Função de segurança para evitar erro de data fora do intervalo
         def clamp_date(d, min_d, max_d):
             if d < min_d: return min_d
@@ -831,21 +903,11 @@ if isinstance(end, datetime):
 if start > end:
     start, end = end, start
 
-filtered_messages = []
-for m in all_messages:
-    candidate = None
-    for key in ("date", "message.date", "message.date_unixtime", "message.date_unixtime_str"):
-        if key in m and m.get(key) is not None:
-            candidate = try_parse_iso_date(m.get(key))
-            break
-    if candidate is None:
-        candidate = try_parse_iso_date(m.get("text") or m.get("message") or "")
-    if candidate is None:
-        continue
-    if start <= candidate <= end:
-        filtered_messages.append(m)
-
-data_filtrada = {"messages": filtered_messages}
+# só refiltra se o período mudou desde o primeiro filtro (ex.: botões de atalho)
+if filtered_period != (start, end):
+    filtered_messages = filter_messages_by_date(all_messages, msg_dates, start, end)
+    data_filtrada = {"messages": filtered_messages}
+    filtered_fingerprint = (all_fingerprint, start, end)
 
 # Renderiza a página selecionada
 if pagina == "Resumo Executivo":
@@ -872,28 +934,28 @@ elif pagina == "Validacao_Horarios":
 elif pagina == "Performance_Paridades":
     # chama o módulo dedicado (usa os dados filtrados)
     try:
-        performance_paridades.render_from_json(data_filtrada)
+        performance_paridades.render_from_json(data_filtrada, filtered_fingerprint)
     except Exception as e:
         st.error("Erro ao executar performance_paridades. Verifique o arquivo performance_paridades.py")
         st.exception(e)
 elif pagina == "Analise_Gales":
     # chama o módulo dedicado (usa os dados filtrados)
     try:
-        analise_gales.render_from_json(data_filtrada)
+        analise_gales.render_from_json(data_filtrada, filtered_fingerprint)
     except Exception as e:
         st.error("Erro ao executar analise_gales. Verifique o arquivo analise_gales.py")
         st.exception(e)
 elif pagina == "Padroes_Tendencias":
     # chama o módulo dedicado (usa os dados filtrados)
     try:
-        padroes_tendencias.render_from_json(data_filtrada)
+        padroes_tendencias.render_from_json(data_filtrada, filtered_fingerprint)
     except Exception as e:
         st.error("Erro ao executar padroes_tendencias. Verifique o arquivo padroes_tendencias.py")
         st.exception(e)
 elif pagina == "Gestao_Risco":
     # chama o módulo gestao_risco integrado (usa os dados filtrados)
     try:
-        gestao_risco.render_from_json(data_filtrada)
+        gestao_risco.render_from_json(data_filtrada, filtered_fingerprint)
     except AttributeError:
         # fallback para a implementação local se existir
         try:
@@ -0,0 +1,39 @@
+# comum.py
+from typing import Iterable, List
+
+# Quebras de linha (as mesmas do str.splitlines) viram espaço numa única passada
+NL_TRANS = str.maketrans({c: " " for c in "\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"})
+
+# Campos de texto lidos pelas páginas, na ordem de preferência
+MESSAGE_TEXT_KEYS = ("text", "message.text", "message", "message_text")
+
+# Todos os campos que o app e as páginas leem de cada mensagem (entram na chave do cache)
+FINGERPRINT_KEYS = (
+    "id", "edited",
+    "date", "message.date", "message.date_unixtime", "message.date_unixtime_str", "message.date_unixtime_ms",
+) + MESSAGE_TEXT_KEYS
+
+def _hashable(value):
+    """Texto do Telegram pode vir como lista de trechos (não hasheável): usa o repr."""
+    return value if value is None or isinstance(value, (str, int, float)) else repr(value)
+
+def messages_fingerprint(messages: List[dict]) -> tuple:
+    """
+    Chave do cache por conteúdo: todos os campos de FINGERPRINT_KEYS de cada mensagem.
+    Evita que o Streamlit faça hash de cada dict, mas um re-export editado
+    (mesmos ids, texto ou data diferente) gera outra chave.
+    """
+    rows = [tuple(map(m.get, FINGERPRINT_KEYS)) for m in messages]
+    try:
+        return len(messages), hash(tuple(rows))
+    except TypeError:
+        # algum campo é lista/dict: converte só nesse caso
+        return len(messages), hash(tuple(tuple(map(_hashable, r)) for r in rows))
+
+def html_table(css_class: str, headers: List[str], rows: Iterable) -> str:
+    """
+    Monta uma tabela HTML pequena direto em string (estrutura fixa, sem to_html).
+    """
+    head = "".join(f"<th>{h}</th>" for h in headers)
+    body = "".join("<tr>" + "".join(f"<td>{c}</td>" for c in row) + "</tr>" for row in rows)
+    return f'<table class="{css_class}"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
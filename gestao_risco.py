@@ -1,12 +1,15 @@
 # gestao_risco.py
 import re
 from datetime import datetime
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Tuple
 import math
 
-import pandas as pd
+import numpy as np
 import streamlit as st
 
+from comum import NL_TRANS, html_table, messages_fingerprint
+
 # Regex para mensagens resolvidas
 RESOLVED_RE = re.compile(
     r"^(?P<check>[✅❌🃏])(?P<sup>[\u00b9\u00b2\u00b3\d]?)\s*"
@@ -14,98 +17,335 @@ RESOLVED_RE = re.compile(
     flags=re.IGNORECASE,
 )
 
-SUPERSCRIPT_MAP = {
-    "\u00b9": 1,
-    "\u00b2": 2,
-    "\u00b3": 3,
-    "1": 1,
-    "2": 2,
-    "3": 3,
+# Sobrescritos viram dígitos; só "1", "2" e "3" contam como nível de gale
+_SUP_TRANS = str.maketrans({"\u00b9": "1", "\u00b2": "2", "\u00b3": "3"})  # ¹ ² ³
+_GALE_DIGITS = ("1", "2", "3")
+
+# Usados pelo parser rápido (_parse_resolved_fast)
+_RESULT_CHECKS = ("✅", "❌", "🃏")
+_SUP_CHARS = "\u00b9\u00b2\u00b30123456789"
+_RESULTS = ("WIN", "LOSS", "DOJI")
+
+# Código int8 de cada resultado (também é a linha da tabela de lucro); o resto conta como LOSS
+_RESULT_CODES = {"DOJI": 0, "WIN": 1, "LOSS": 2}
+
+# CSS da tabela de métricas (enviado junto com a tabela, no mesmo st.markdown)
+_RISK_TABLE_CSS = """
+<style>
+.risk-table {
+    border-collapse: collapse;
+    width: 100%;
+    font-family: "Inter", "Arial", sans-serif;
+}
+.risk-table th {
+    background-color: #f7f9fc;
+    color: #333;
+    padding: 12px;
+    text-align: left;
+    font-weight: 600;
+    border-bottom: 2px solid #e6eef6;
+}
+.risk-table td {
+    padding: 10px 12px;
+    border-top: 1px solid #f0f4f8;
+    color: #333;
 }
+.risk-table tr:hover {
+    background-color: #f8f9fa;
+}
+</style>
+"""
+
+_TABLE_WRAP_TMPL = '<div style="overflow-x: auto; padding: 10px; background: #ffffff; border-radius: 8px; border: 1px solid #eef2f6;">{table}</div>'
+
+# Templates HTML dos cards (montados uma única vez, preenchidos com .format)
+_CARD_GRAD_TMPL = """
+<div style="background: linear-gradient(135deg, {c1} 0%, {c2} 100%); 
+            border-radius: 12px; padding: 20px; color: white; text-align: center;">
+    <div style="font-size: 13px; opacity: 0.9; margin-bottom: 8px;">{label}</div>
+    <div style="font-size: 28px; font-weight: 700; margin: 8px 0;">{value}</div>
+    <div style="font-size: 12px; opacity: 0.8;">{footer}</div>
+</div>
+"""
+
+_CICLO_HEADER_TMPL = """
+<div style="background: white; border: 2px solid {color}; border-radius: 12px; padding: 20px;">
+    <div style="font-size: 16px; font-weight: 700; color: {color}; margin-bottom: 16px;">
+        {title}
+    </div>
+"""
+
+_CICLO_BODY_TMPL = """
+    <div style="margin-bottom: 12px;">
+        <div style="font-size: 13px; color: #666; font-weight: 600;">Entrada Base (G0)</div>
+        <div style="font-size: 24px; font-weight: 700; color: #0b8043;">R$ {g0:.2f}</div>
+    </div>
+    <div style="margin-bottom: 12px;">
+        <div style="font-size: 13px; color: #666; font-weight: 600;">Gale 1</div>
+        <div style="font-size: 24px; font-weight: 700; color: #1a73e8;">R$ {g1:.2f}</div>
+    </div>
+    <div style="margin-bottom: 12px;">
+        <div style="font-size: 13px; color: #666; font-weight: 600;">Gale 2</div>
+        <div style="font-size: 24px; font-weight: 700; color: #f9ab00;">R$ {g2:.2f}</div>
+    </div>
+    <div style="border-top: 2px solid #eee; padding-top: 12px; margin-top: 12px;">
+        <div style="font-size: 13px; color: #666;">Risco Máximo do Ciclo</div>
+        <div style="font-size: 20px; font-weight: 700; color: #d93025;">R$ {total:.2f}</div>
+    </div>
+</div>
+"""
 
-def _sup_to_level(s: str) -> int:
-    if not s:
-        return 0
-    return SUPERSCRIPT_MAP.get(s, 0)
+_CARD_DD_TMPL = """
+<div style="background: #fce4ec; border-left: 4px solid #d93025; 
+            border-radius: 8px; padding: 16px;">
+    <div style="font-size: 13px; color: #666; font-weight: 600;">{label}</div>
+    <div style="font-size: 28px; font-weight: 700; color: #d93025; margin: 8px 0;">
+        {value}
+    </div>
+    <div style="font-size: 12px; color: #666;">{footer}</div>
+</div>
+"""
+
+_CARD_PROB_TMPL = """
+<div style="background: white; border: 2px solid {color}; border-radius: 8px; 
+            padding: 16px; text-align: center;">
+    <div style="font-size: 24px; margin-bottom: 8px;">{icon}</div>
+    <div style="font-size: 12px; color: #666; font-weight: 600; margin-bottom: 8px;">
+        {label}
+    </div>
+    <div style="font-size: 24px; font-weight: 700; color: {color};">
+        {prob:.2f}%
+    </div>
+</div>
+"""
+
+_CARD_CAPITAL_MIN_TMPL = """
+<div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+            border-radius: 12px; padding: 24px; color: white;">
+    <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">💰 CAPITAL MÍNIMO RECOMENDADO</div>
+    <div style="font-size: 36px; font-weight: 700; margin: 12px 0;">R$ {valor:.2f}</div>
+    <div style="font-size: 13px; opacity: 0.9;">
+        Baseado em 5x o risco máximo do Ciclo 1
+    </div>
+</div>
+"""
+
+_CARD_STATUS_TMPL = """
+<div style="background: linear-gradient(135deg, {color} 0%, {color}dd 100%); 
+            border-radius: 12px; padding: 24px; color: white;">
+    <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">✅ STATUS DO CAPITAL</div>
+    <div style="font-size: 36px; font-weight: 700; margin: 12px 0;">{status}</div>
+    <div style="font-size: 13px; opacity: 0.9;">
+        Capital atual: R$ {capital:.2f}
+    </div>
+</div>
+"""
+
+_CARD_PROJ_TMPL = """
+<div style="background: white; border-left: 4px solid {color}; 
+            border-radius: 8px; padding: 20px;">
+    <div style="font-size: 13px; color: #666; font-weight: 600; margin-bottom: 8px;">
+        {label}
+    </div>
+    <div style="font-size: 32px; font-weight: 700; color: {color};">
+        R$ {valor:.2f}
+    </div>
+    <div style="font-size: 12px; color: #666; margin-top: 8px;">
+        {roi:.1f}% ROI mensal
+    </div>
+</div>
+"""
+
+_TEXT_KEYS = ("text", "message.text", "message", "message_text")
 
 def _get_text_from_msg(msg: dict) -> str:
-    for k in ("text", "message.text", "message", "message_text"):
+    for k in _TEXT_KEYS:
         v = msg.get(k)
         if isinstance(v, str) and v.strip():
             return v
     v = msg.get("text") or msg.get("message")
     return v if isinstance(v, str) else ""
 
-def _extract_records(messages: List[dict]) -> List[dict]:
-    records = []
+def _detect_text_key(messages: List[dict]):
+    """
+    Chave de texto usada pelo export, olhando só a primeira mensagem (o esquema é uniforme).
+    """
+    first = messages[0] if messages else {}
+    for k in _TEXT_KEYS:
+        v = first.get(k)
+        if isinstance(v, str) and v.strip():
+            return k
+    return None
+
+def _parse_resolved_fast(line: str):
+    """
+    Parser sem regex para o formato canônico "<emoji><sup?> PAR - HH:MM:SS - TF - DIR - RESULTADO".
+    Retorna (sup, resultado) ou None quando a linha foge do formato (aí vale o RESOLVED_RE).
+    """
+    if not line or line[0] not in _RESULT_CHECKS:
+        return None
+    rest = line[1:]
+    sup = ""
+    if rest and rest[0] in _SUP_CHARS:
+        sup, rest = rest[0], rest[1:]
+    parts = rest.lstrip().split(" - ")
+    if len(parts) != 5:
+        return None
+    pair, hora, tf, direcao, result = parts
+    if not (pair.isascii() and pair.replace("-", "").replace("_", "").isalnum()):
+        return None
+    if not (len(hora) == 8 and hora.isascii() and hora[2] == ":" and hora[5] == ":"
+            and (hora[:2] + hora[3:5] + hora[6:]).isdigit()):
+        return None
+    if not (tf.isascii() and tf.replace("_", "").isalnum()
+            and direcao.isascii() and direcao.replace("_", "").isalnum()):
+        return None
+    if not result.isascii() or result.upper() not in _RESULTS:
+        return None
+    return sup, result
+
+def _extract_records(messages: List[dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Códigos de resultado (0=DOJI, 1=WIN, 2=LOSS) e níveis de gale das operações resolvidas, como dois arrays int8.
+    """
+    result_codes, gale_levels = [], []
+    _match = RESOLVED_RE.match
+    text_key = _detect_text_key(messages)
     
     for msg in messages:
-        text = _get_text_from_msg(msg)
-        if not text:
+        # Caminho rápido pela chave detectada; a sondagem completa só quando ela vem vazia
+        text = msg.get(text_key) if text_key else None
+        if type(text) is not str or not text or text.isspace():
+            text = _get_text_from_msg(msg)
+            if not text:
+                continue
+        one_line = text.strip()
+        # A maioria das mensagens não começa com o emoji de resultado: descarta sem parser/regex
+        if not one_line.startswith(_RESULT_CHECKS):
             continue
-        one_line = " ".join(text.splitlines()).strip()
-        m = RESOLVED_RE.match(one_line)
-        if m:
-            try:
-                sup = m.group("sup") or ""
-                gale_level = _sup_to_level(sup)
-                
-                if "r" in m.groupdict():
-                    result_raw = m.group("r").strip().upper()
-                else:
-                    result_raw = m.groups()[-1].strip().upper()
-                    
-                result = "DOJI" if result_raw == "DOJI" else ("WIN" if result_raw == "WIN" else "LOSS")
-                
-                records.append({
-                    "result": result,
-                    "gale_level": gale_level,
-                })
-            except:
+        # strip antes do translate: só as linhas candidatas pagam a troca das quebras
+        one_line = one_line.translate(NL_TRANS)
+        parsed = _parse_resolved_fast(one_line)
+        if parsed is None:
+            # Fora do formato canônico: a regex decide
+            m = _match(one_line)
+            if not m:
                 continue
+            parsed = (m.group("sup") or "", m.group("r"))
+        sup, result_raw = parsed
+        if sup:
+            digit = sup.translate(_SUP_TRANS)
+            gale_level = int(digit) if digit in _GALE_DIGITS else 0
+        else:
+            gale_level = 0
+        result_codes.append(_RESULT_CODES.get(result_raw.strip().upper(), 2))
+        gale_levels.append(gale_level)
                 
-    return records
+    return np.array(result_codes, dtype=np.int8), np.array(gale_levels, dtype=np.int8)
 
-def calculate_profit(result: str, gale_level: int, stakes: List[float], payout: float = 0.85):
-    """Calcula lucro/perda de uma operação"""
-    if result == "DOJI":
-        return 0.0
-    
-    level = min(gale_level, len(stakes) - 1)
-    
-    if result == "WIN":
-        if level == 0:
-            return stakes[0] * payout
-        else:
-            lost = sum(stakes[:level])
-            win_amount = stakes[level] * payout
-            return -lost + win_amount
-    else:  # LOSS
-        return -sum(stakes[:level + 1])
 
-def simulate_equity_curve(records: List[dict], capital: float, stakes: List[float], payout: float = 0.85):
+@lru_cache(maxsize=32)
+def _profit_table(stakes: Tuple[float, ...], payout: float) -> np.ndarray:
+    """
+    Lucro/perda por (resultado, nível de gale): linhas DOJI/WIN/LOSS (os códigos), uma coluna por stake.
+    Montada uma vez por configuração de stakes/payout (somente leitura, é compartilhada pelo cache).
+    """
+    stakes_arr = np.asarray(stakes, dtype=np.float64)
+    cum_losses = np.cumsum(stakes_arr)
+    # WIN no nível i: stake do nível * payout menos o que foi perdido nos níveis anteriores
+    win_payouts = stakes_arr * payout - np.concatenate(([0.0], cum_losses[:-1]))
+    table = np.vstack([np.zeros_like(stakes_arr), win_payouts, -cum_losses])
+    table.setflags(write=False)
+    return table
+
+def compute_profits(result_codes: np.ndarray, gale_levels: np.ndarray, stakes: List[float], payout: float = 0.85) -> np.ndarray:
+    """
+    Lucro/perda de todas as operações de uma vez. No nível de gale k (limitado a len(stakes) - 1):
+    DOJI -> 0; WIN -> stakes[k] * payout - sum(stakes[:k]); LOSS -> -sum(stakes[:k + 1]).
+    """
+    levels = np.minimum(gale_levels.astype(np.intp), len(stakes) - 1)
+    return _profit_table(tuple(stakes), payout)[result_codes.astype(np.intp), levels]
+
+def simulate_equity_curve(result_codes: np.ndarray, gale_levels: np.ndarray, capital: float, stakes: List[float], payout: float = 0.85, profits: np.ndarray = None):
     """Simula curva de capital ao longo do tempo"""
-    equity = [capital]
-    current = capital
+    if profits is None:
+        profits = compute_profits(result_codes, gale_levels, stakes, payout)
+    # cumsum sequencial a partir do capital: mesmo acúmulo do saldo operação a operação
+    return np.cumsum(np.concatenate(([capital], profits)))
+
+def _simulate_and_drawdown(result_codes: np.ndarray, gale_levels: np.ndarray, capital: float, stakes: List[float], payout: float):
+    """
+    Lucros, curva de capital e drawdown de uma configuração de stakes numa chamada só
+    (núcleo reaproveitável para comparar várias configurações sobre os mesmos arrays).
+    Retorna (profits, equity, max_dd, max_dd_pct, min_balance).
+    """
+    profits = compute_profits(result_codes, gale_levels, stakes, payout)
+    equity = simulate_equity_curve(result_codes, gale_levels, capital, stakes, payout, profits=profits)
+    
+    # Pico acumulado vetorizado; o % é o do maior drawdown em R$
+    peaks = np.maximum.accumulate(equity)
+    dd = peaks - equity
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd_pct = np.where(peaks > 0, dd / peaks * 100, 0.0)
+    idx_max_dd = int(dd.argmax())
+    return profits, equity, float(dd[idx_max_dd]), float(dd_pct[idx_max_dd]), float(equity.min())
+
+def _compute_risk_metrics(result_codes: np.ndarray, gale_levels: np.ndarray, capital: float, stakes: List[float], payout: float) -> dict:
+    """
+    Todas as métricas numéricas da página (sem Streamlit): saldo, drawdown, probabilidades e projeções.
+    """
+    total_ops = len(result_codes)
+    _, wins, losses = np.bincount(result_codes, minlength=3).tolist()
+    win_rate = (wins / (wins + losses)) if (wins + losses) > 0 else 0
+    loss_rate = 1 - win_rate
     
-    for rec in records:
-        profit = calculate_profit(rec["result"], rec["gale_level"], stakes, payout)
-        current += profit
-        equity.append(current)
+    # Curva de capital + drawdown
+    profits, eq, max_dd, max_dd_pct, min_balance = _simulate_and_drawdown(result_codes, gale_levels, capital, stakes, payout)
     
-    return equity
+    # Probabilidades de sequências de loss
+    lr2 = loss_rate * loss_rate
+    lr4 = lr2 * lr2
+    
+    # Lucro médio por operação
+    lucro_total = float(profits.sum())
+    lucro_medio = lucro_total / len(profits) if len(profits) else 0
+    
+    # Projeções mensais (assumindo 22 dias úteis)
+    lucro_diario_atual = lucro_total / 30 if len(profits) > 0 else 0
+    proj_realista = lucro_diario_atual * 22
+    
+    return {
+        "total_ops": total_ops,
+        "final_balance": float(eq[-1]),
+        "max_dd": max_dd,
+        "max_dd_pct": max_dd_pct,
+        "min_balance": min_balance,
+        "prob_2_loss": lr2 * 100,
+        "prob_3_loss": lr2 * loss_rate * 100,
+        "prob_4_loss": lr4 * 100,
+        "prob_5_loss": lr4 * loss_rate * 100,
+        "lucro_medio": lucro_medio,
+        "proj_otimista": proj_realista * 1.5,
+        "proj_realista": proj_realista,
+        "proj_pessimista": proj_realista * 0.7,
+    }
 
-def render_from_json(json_data: dict):
+@st.cache_data(show_spinner=False)
+def _build_risk_metrics(fingerprint: tuple, _messages: List[dict], capital: float, stakes: Tuple[float, ...], payout: float):
+    """
+    Extração + métricas calculadas uma vez por conjunto de mensagens e parâmetros (None se não houver operações).
+    """
+    result_codes, gale_levels = _extract_records(_messages)
+    if len(result_codes) == 0:
+        return None
+    return _compute_risk_metrics(result_codes, gale_levels, capital, list(stakes), payout)
+
+def render_from_json(json_data: dict, fingerprint: tuple = None):
     """
     Renderiza a página de Gestão de Risco a partir do JSON.
+    `fingerprint` é a chave do cache já calculada pelo app (se ausente, é calculada aqui).
     """
     messages = json_data.get("messages", [])
-    records = _extract_records(messages)
-    df = pd.DataFrame(records)
-
-    if df.empty:
-        st.warning("⚠️ Nenhum dado disponível para análise de risco.")
-        return
 
     # ===== PARÂMETROS PADRÃO =====
     capital_inicial = 500.0
@@ -122,45 +362,28 @@ def render_from_json(json_data: dict):
     stake_c2_g1 = 42.69
     stake_c2_g2 = 91.76
     stakes_c2 = [stake_c2_g0, stake_c2_g1, stake_c2_g2]
-
-    # ===== CÁLCULOS =====
-    total_ops = len(df)
-    wins = len(df[df["result"] == "WIN"])
-    losses = len(df[df["result"] == "LOSS"])
-    win_rate = (wins / (wins + losses)) if (wins + losses) > 0 else 0
-    loss_rate = 1 - win_rate
-    
-    # Simular curva de capital
-    equity_curve = simulate_equity_curve(records, capital_inicial, stakes_c1, payout_minimo)
     
-    # Drawdown
-    peak = capital_inicial
-    max_dd = 0
-    max_dd_pct = 0
-    min_balance = capital_inicial
-    
-    for balance in equity_curve:
-        if balance > peak:
-            peak = balance
-        dd = peak - balance
-        dd_pct = (dd / peak * 100) if peak > 0 else 0
-        if dd > max_dd:
-            max_dd = dd
-            max_dd_pct = dd_pct
-        if balance < min_balance:
-            min_balance = balance
-    
-    final_balance = equity_curve[-1]
-    
-    # Probabilidades de sequências de loss
-    prob_2_loss = loss_rate ** 2 * 100
-    prob_3_loss = loss_rate ** 3 * 100
-    prob_4_loss = loss_rate ** 4 * 100
-    prob_5_loss = loss_rate ** 5 * 100
+    # Risco máximo de cada ciclo (perder o ciclo inteiro)
+    total_c1 = sum(stakes_c1)
+    total_c2 = sum(stakes_c2)
+
+    # ===== CÁLCULOS (em cache) =====
+    metrics = _build_risk_metrics(fingerprint or messages_fingerprint(messages), messages, capital_inicial, tuple(stakes_c1), payout_minimo)
+
+    if metrics is None:
+        st.warning("⚠️ Nenhum dado disponível para análise de risco.")
+        return
+
+    total_ops = metrics["total_ops"]
+    final_balance = metrics["final_balance"]
+    max_dd, max_dd_pct, min_balance = metrics["max_dd"], metrics["max_dd_pct"], metrics["min_balance"]
+    prob_2_loss, prob_3_loss = metrics["prob_2_loss"], metrics["prob_3_loss"]
+    prob_4_loss, prob_5_loss = metrics["prob_4_loss"], metrics["prob_5_loss"]
+    lucro_medio = metrics["lucro_medio"]
+    proj_otimista, proj_realista, proj_pessimista = metrics["proj_otimista"], metrics["proj_realista"], metrics["proj_pessimista"]
     
     # Capital mínimo recomendado (baseado em risco de 3 losses seguidos)
-    max_loss_c1 = sum(stakes_c1)  # Perder todo o ciclo 1
-    capital_min_recomendado = max_loss_c1 * 5  # 5x o risco máximo
+    capital_min_recomendado = total_c1 * 5  # 5x o risco máximo
     
     # Status do capital
     if capital_inicial >= capital_min_recomendado:
@@ -172,18 +395,6 @@ def render_from_json(json_data: dict):
     else:
         status_capital = "INSUFICIENTE"
         status_color = "#d93025"
-    
-    # Lucro médio por operação
-    profits = [calculate_profit(r["result"], r["gale_level"], stakes_c1, payout_minimo) for r in records]
-    lucro_medio = sum(profits) / len(profits) if profits else 0
-    
-    # Projeções mensais (assumindo 22 dias úteis)
-    ops_por_dia = total_ops / 30 if total_ops > 0 else 10  # estimativa
-    
-    lucro_diario_atual = sum(profits) / 30 if len(profits) > 0 else 0
-    proj_otimista = lucro_diario_atual * 22 * 1.5
-    proj_realista = lucro_diario_atual * 22
-    proj_pessimista = lucro_diario_atual * 22 * 0.7
 
     # ===== RENDERIZAÇÃO =====
     st.markdown("<h1 style='text-align:center; color:#1f4068; margin-bottom:30px;'>🛡️ Gestão de Risco</h1>", unsafe_allow_html=True)
@@ -194,44 +405,29 @@ def render_from_json(json_data: dict):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                    border-radius: 12px; padding: 20px; color: white; text-align: center;">
-            <div style="font-size: 13px; opacity: 0.9; margin-bottom: 8px;">💵 CAPITAL INICIAL</div>
-            <div style="font-size: 28px; font-weight: 700; margin: 8px 0;">R$ {capital_inicial:.2f}</div>
-            <div style="font-size: 12px; opacity: 0.8;">Banca inicial</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CARD_GRAD_TMPL.format(
+            c1="#667eea", c2="#764ba2", label="💵 CAPITAL INICIAL",
+            value=f"R$ {capital_inicial:.2f}", footer="Banca inicial",
+        ), unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #0b8043 0%, #12b35a 100%); 
-                    border-radius: 12px; padding: 20px; color: white; text-align: center;">
-            <div style="font-size: 13px; opacity: 0.9; margin-bottom: 8px;">💵 SALDO FINAL</div>
-            <div style="font-size: 28px; font-weight: 700; margin: 8px 0;">R$ {final_balance:.2f}</div>
-            <div style="font-size: 12px; opacity: 0.8;">Após {total_ops} ops</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CARD_GRAD_TMPL.format(
+            c1="#0b8043", c2="#12b35a", label="💵 SALDO FINAL",
+            value=f"R$ {final_balance:.2f}", footer=f"Após {total_ops} ops",
+        ), unsafe_allow_html=True)
     
     with col3:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #1a73e8 0%, #4285f4 100%); 
-                    border-radius: 12px; padding: 20px; color: white; text-align: center;">
-            <div style="font-size: 13px; opacity: 0.9; margin-bottom: 8px;">📈 LUCRO TOTAL</div>
-            <div style="font-size: 28px; font-weight: 700; margin: 8px 0;">R$ {final_balance - capital_inicial:.2f}</div>
-            <div style="font-size: 12px; opacity: 0.8;">{((final_balance/capital_inicial - 1) * 100):.1f}% ROI</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CARD_GRAD_TMPL.format(
+            c1="#1a73e8", c2="#4285f4", label="📈 LUCRO TOTAL",
+            value=f"R$ {final_balance - capital_inicial:.2f}",
+            footer=f"{((final_balance/capital_inicial - 1) * 100):.1f}% ROI",
+        ), unsafe_allow_html=True)
     
     with col4:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #f9ab00 0%, #fbc02d 100%); 
-                    border-radius: 12px; padding: 20px; color: white; text-align: center;">
-            <div style="font-size: 13px; opacity: 0.9; margin-bottom: 8px;">💎 PAYOUT</div>
-            <div style="font-size: 28px; font-weight: 700; margin: 8px 0;">{payout_minimo * 100:.0f}%</div>
-            <div style="font-size: 12px; opacity: 0.8;">Mínimo usado</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CARD_GRAD_TMPL.format(
+            c1="#f9ab00", c2="#fbc02d", label="💎 PAYOUT",
+            value=f"{payout_minimo * 100:.0f}%", footer="Mínimo usado",
+        ), unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
@@ -241,60 +437,16 @@ def render_from_json(json_data: dict):
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("""
-        <div style="background: white; border: 2px solid #667eea; border-radius: 12px; padding: 20px;">
-            <div style="font-size: 16px; font-weight: 700; color: #667eea; margin-bottom: 16px;">
-                📊 CICLO 1 (Conservador)
-            </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown(f"""
-            <div style="margin-bottom: 12px;">
-                <div style="font-size: 13px; color: #666; font-weight: 600;">Entrada Base (G0)</div>
-                <div style="font-size: 24px; font-weight: 700; color: #0b8043;">R$ {stake_c1_g0:.2f}</div>
-            </div>
-            <div style="margin-bottom: 12px;">
-                <div style="font-size: 13px; color: #666; font-weight: 600;">Gale 1</div>
-                <div style="font-size: 24px; font-weight: 700; color: #1a73e8;">R$ {stake_c1_g1:.2f}</div>
-            </div>
-            <div style="margin-bottom: 12px;">
-                <div style="font-size: 13px; color: #666; font-weight: 600;">Gale 2</div>
-                <div style="font-size: 24px; font-weight: 700; color: #f9ab00;">R$ {stake_c1_g2:.2f}</div>
-            </div>
-            <div style="border-top: 2px solid #eee; padding-top: 12px; margin-top: 12px;">
-                <div style="font-size: 13px; color: #666;">Risco Máximo do Ciclo</div>
-                <div style="font-size: 20px; font-weight: 700; color: #d93025;">R$ {sum(stakes_c1):.2f}</div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CICLO_HEADER_TMPL.format(color="#667eea", title="📊 CICLO 1 (Conservador)"), unsafe_allow_html=True)
+        st.markdown(_CICLO_BODY_TMPL.format(
+            g0=stake_c1_g0, g1=stake_c1_g1, g2=stake_c1_g2, total=total_c1,
+        ), unsafe_allow_html=True)
     
     with col2:
-        st.markdown("""
-        <div style="background: white; border: 2px solid #f9ab00; border-radius: 12px; padding: 20px;">
-            <div style="font-size: 16px; font-weight: 700; color: #f9ab00; margin-bottom: 16px;">
-                🚀 CICLO 2 (Agressivo)
-            </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown(f"""
-            <div style="margin-bottom: 12px;">
-                <div style="font-size: 13px; color: #666; font-weight: 600;">Entrada Base (G0)</div>
-                <div style="font-size: 24px; font-weight: 700; color: #0b8043;">R$ {stake_c2_g0:.2f}</div>
-            </div>
-            <div style="margin-bottom: 12px;">
-                <div style="font-size: 13px; color: #666; font-weight: 600;">Gale 1</div>
-                <div style="font-size: 24px; font-weight: 700; color: #1a73e8;">R$ {stake_c2_g1:.2f}</div>
-            </div>
-            <div style="margin-bottom: 12px;">
-                <div style="font-size: 13px; color: #666; font-weight: 600;">Gale 2</div>
-                <div style="font-size: 24px; font-weight: 700; color: #f9ab00;">R$ {stake_c2_g2:.2f}</div>
-            </div>
-            <div style="border-top: 2px solid #eee; padding-top: 12px; margin-top: 12px;">
-                <div style="font-size: 13px; color: #666;">Risco Máximo do Ciclo</div>
-                <div style="font-size: 20px; font-weight: 700; color: #d93025;">R$ {sum(stakes_c2):.2f}</div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CICLO_HEADER_TMPL.format(color="#f9ab00", title="🚀 CICLO 2 (Agressivo)"), unsafe_allow_html=True)
+        st.markdown(_CICLO_BODY_TMPL.format(
+            g0=stake_c2_g0, g1=stake_c2_g1, g2=stake_c2_g2, total=total_c2,
+        ), unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
@@ -304,40 +456,19 @@ def render_from_json(json_data: dict):
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown(f"""
-        <div style="background: #fce4ec; border-left: 4px solid #d93025; 
-                    border-radius: 8px; padding: 16px;">
-            <div style="font-size: 13px; color: #666; font-weight: 600;">Drawdown Máximo (R$)</div>
-            <div style="font-size: 28px; font-weight: 700; color: #d93025; margin: 8px 0;">
-                R$ {max_dd:.2f}
-            </div>
-            <div style="font-size: 12px; color: #666;">Maior perda acumulada</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CARD_DD_TMPL.format(
+            label="Drawdown Máximo (R$)", value=f"R$ {max_dd:.2f}", footer="Maior perda acumulada",
+        ), unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"""
-        <div style="background: #fce4ec; border-left: 4px solid #d93025; 
-                    border-radius: 8px; padding: 16px;">
-            <div style="font-size: 13px; color: #666; font-weight: 600;">Drawdown Máximo (%)</div>
-            <div style="font-size: 28px; font-weight: 700; color: #d93025; margin: 8px 0;">
-                {max_dd_pct:.2f}%
-            </div>
-            <div style="font-size: 12px; color: #666;">% do capital</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CARD_DD_TMPL.format(
+            label="Drawdown Máximo (%)", value=f"{max_dd_pct:.2f}%", footer="% do capital",
+        ), unsafe_allow_html=True)
     
     with col3:
-        st.markdown(f"""
-        <div style="background: #fce4ec; border-left: 4px solid #d93025; 
-                    border-radius: 8px; padding: 16px;">
-            <div style="font-size: 13px; color: #666; font-weight: 600;">Saldo Mínimo</div>
-            <div style="font-size: 28px; font-weight: 700; color: #d93025; margin: 8px 0;">
-                R$ {min_balance:.2f}
-            </div>
-            <div style="font-size: 12px; color: #666;">Menor saldo atingido</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CARD_DD_TMPL.format(
+            label="Saldo Mínimo", value=f"R$ {min_balance:.2f}", footer="Menor saldo atingido",
+        ), unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
@@ -356,18 +487,7 @@ def render_from_json(json_data: dict):
     for idx, (label, prob, icon) in enumerate(probs):
         with cols[idx]:
             color = "#0b8043" if prob < 5 else "#f9ab00" if prob < 10 else "#d93025"
-            st.markdown(f"""
-            <div style="background: white; border: 2px solid {color}; border-radius: 8px; 
-                        padding: 16px; text-align: center;">
-                <div style="font-size: 24px; margin-bottom: 8px;">{icon}</div>
-                <div style="font-size: 12px; color: #666; font-weight: 600; margin-bottom: 8px;">
-                    {label}
-                </div>
-                <div style="font-size: 24px; font-weight: 700; color: {color};">
-                    {prob:.2f}%
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_CARD_PROB_TMPL.format(color=color, icon=icon, label=label, prob=prob), unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
@@ -377,28 +497,12 @@ def render_from_json(json_data: dict):
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                    border-radius: 12px; padding: 24px; color: white;">
-            <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">💰 CAPITAL MÍNIMO RECOMENDADO</div>
-            <div style="font-size: 36px; font-weight: 700; margin: 12px 0;">R$ {capital_min_recomendado:.2f}</div>
-            <div style="font-size: 13px; opacity: 0.9;">
-                Baseado em 5x o risco máximo do Ciclo 1
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CARD_CAPITAL_MIN_TMPL.format(valor=capital_min_recomendado), unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, {status_color} 0%, {status_color}dd 100%); 
-                    border-radius: 12px; padding: 24px; color: white;">
-            <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">✅ STATUS DO CAPITAL</div>
-            <div style="font-size: 36px; font-weight: 700; margin: 12px 0;">{status_capital}</div>
-            <div style="font-size: 13px; opacity: 0.9;">
-                Capital atual: R$ {capital_inicial:.2f}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CARD_STATUS_TMPL.format(
+            color=status_color, status=status_capital, capital=capital_inicial,
+        ), unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
@@ -408,52 +512,22 @@ def render_from_json(json_data: dict):
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown(f"""
-        <div style="background: white; border-left: 4px solid #0b8043; 
-                    border-radius: 8px; padding: 20px;">
-            <div style="font-size: 13px; color: #666; font-weight: 600; margin-bottom: 8px;">
-                🚀 OTIMISTA (+50%)
-            </div>
-            <div style="font-size: 32px; font-weight: 700; color: #0b8043;">
-                R$ {proj_otimista:.2f}
-            </div>
-            <div style="font-size: 12px; color: #666; margin-top: 8px;">
-                {((proj_otimista/capital_inicial)*100):.1f}% ROI mensal
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CARD_PROJ_TMPL.format(
+            color="#0b8043", label="🚀 OTIMISTA (+50%)",
+            valor=proj_otimista, roi=(proj_otimista/capital_inicial)*100,
+        ), unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"""
-        <div style="background: white; border-left: 4px solid #1a73e8; 
-                    border-radius: 8px; padding: 20px;">
-            <div style="font-size: 13px; color: #666; font-weight: 600; margin-bottom: 8px;">
-                📈 REALISTA (base atual)
-            </div>
-            <div style="font-size: 32px; font-weight: 700; color: #1a73e8;">
-                R$ {proj_realista:.2f}
-            </div>
-            <div style="font-size: 12px; color: #666; margin-top: 8px;">
-                {((proj_realista/capital_inicial)*100):.1f}% ROI mensal
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CARD_PROJ_TMPL.format(
+            color="#1a73e8", label="📈 REALISTA (base atual)",
+            valor=proj_realista, roi=(proj_realista/capital_inicial)*100,
+        ), unsafe_allow_html=True)
     
     with col3:
-        st.markdown(f"""
-        <div style="background: white; border-left: 4px solid #f9ab00; 
-                    border-radius: 8px; padding: 20px;">
-            <div style="font-size: 13px; color: #666; font-weight: 600; margin-bottom: 8px;">
-                ⚠️ PESSIMISTA (-30%)
-            </div>
-            <div style="font-size: 32px; font-weight: 700; color: #f9ab00;">
-                R$ {proj_pessimista:.2f}
-            </div>
-            <div style="font-size: 12px; color: #666; margin-top: 8px;">
-                {((proj_pessimista/capital_inicial)*100):.1f}% ROI mensal
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_CARD_PROJ_TMPL.format(
+            color="#f9ab00", label="⚠️ PESSIMISTA (-30%)",
+            valor=proj_pessimista, roi=(proj_pessimista/capital_inicial)*100,
+        ), unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
@@ -489,36 +563,8 @@ def render_from_json(json_data: dict):
         ["Projeção Mensal PESSIMISTA", f"R$ {proj_pessimista:.2f}"],
     ]
     
-    df_metrics = pd.DataFrame(metrics_data, columns=["Métrica", "Valor"])
-    
-    st.markdown("""
-    <style>
-    .risk-table {
-        border-collapse: collapse;
-        width: 100%;
-        font-family: "Inter", "Arial", sans-serif;
-    }
-    .risk-table th {
-        background-color: #f7f9fc;
-        color: #333;
-        padding: 12px;
-        text-align: left;
-        font-weight: 600;
-        border-bottom: 2px solid #e6eef6;
-    }
-    .risk-table td {
-        padding: 10px 12px;
-        border-top: 1px solid #f0f4f8;
-        color: #333;
-    }
-    .risk-table tr:hover {
-        background-color: #f8f9fa;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
-    html_table = df_metrics.to_html(index=False, escape=False, classes="risk-table")
-    st.markdown(f'<div style="overflow-x: auto; padding: 10px; background: #ffffff; border-radius: 8px; border: 1px solid #eef2f6;">{html_table}</div>', unsafe_allow_html=True)
+    html_metrics = html_table("risk-table", ["Métrica", "Valor"], metrics_data)
+    st.markdown(_RISK_TABLE_CSS + _TABLE_WRAP_TMPL.format(table=html_metrics), unsafe_allow_html=True)
 
     # ===== RECOMENDAÇÕES =====
     st.markdown("<br>", unsafe_allow_html=True)
@@ -4,9 +4,12 @@ from datetime import datetime
 from typing import List, Dict
 from collections import Counter
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from comum import NL_TRANS, html_table, messages_fingerprint
+
 # Regex para mensagens resolvidas
 RESOLVED_RE = re.compile(
     r"^(?P<check>[✅❌🃏])(?P<sup>[\u00b9\u00b2\u00b3\d]?)\s*"
@@ -33,10 +36,126 @@ DIAS_SEMANA_PT = {
     6: "Domingo"
 }
 
-def _sup_to_level(s: str) -> int:
-    if not s:
-        return 0
-    return SUPERSCRIPT_MAP.get(s, 0)
+# Períodos do mês por dia (intervalos fechados à direita: 1-10, 11-20, 21-31)
+_PERIOD_BINS = [0, 10, 20, 31]
+_PERIOD_LABELS = ["Início (1-10)", "Meio (11-20)", "Fim (21-31)"]
+
+# Faixas de cor do win rate: dia da semana tem 4 (<75, 75-80, 80-85, >=85), o resto 3 (<80, 80-85, >=85)
+_WEEKDAY_WR_CUTS = np.array([75, 80, 85])
+_WEEKDAY_COLORS = np.array(["#d93025", "#f9ab00", "#1a73e8", "#0b8043"], dtype=object)
+_WR_CUTS = np.array([80, 85])
+_WR_COLORS = np.array(["#f9ab00", "#1a73e8", "#0b8043"], dtype=object)
+
+_RESULTS = ["WIN", "LOSS", "DOJI"]
+
+_RESULT_CHECKS = ("✅", "❌", "🃏")
+
+
+# CSS das tabelas detalhadas (enviado junto com a primeira tabela, no mesmo st.markdown)
+_PATTERN_TABLE_CSS = """
+<style>
+.pattern-table {
+    border-collapse: collapse;
+    width: 100%;
+    font-family: "Inter", "Arial", sans-serif;
+}
+.pattern-table th {
+    background-color: #f7f9fc;
+    color: #333;
+    padding: 12px;
+    text-align: left;
+    font-weight: 600;
+    border-bottom: 2px solid #e6eef6;
+}
+.pattern-table td {
+    padding: 10px 12px;
+    border-top: 1px solid #f0f4f8;
+    color: #333;
+}
+.pattern-table tr:hover {
+    background-color: #f8f9fa;
+}
+</style>
+"""
+
+_TABLE_WRAP_TMPL = '<div style="overflow-x: auto; padding: 10px; background: #ffffff; border-radius: 8px; border: 1px solid #eef2f6;">{table}</div>'
+
+# Containers de cada seção: barras empilhadas e cards lado a lado (flex)
+_BARS_TMPL = '<div>{items}</div>'
+_CARDS_ROW_TMPL = '<div style="display: flex; flex-wrap: wrap; gap: 16px;">{items}</div>'
+
+_WEEKDAY_BAR_TMPL = """<div style="margin-bottom: 16px;">
+    <div style="display: flex; justify-content: space-between; margin-bottom: 6px;">
+        <span style="font-weight: 600; color: #1f4068; font-size: 14px;">{label}</span>
+        <span style="font-weight: 600; color: #666; font-size: 13px;">
+            {total:,} ops | WR: <strong style="color: {color};">{wr:.1f}%</strong>
+        </span>
+    </div>
+    <div style="background: #e8eaed; border-radius: 6px; height: 28px; overflow: hidden;">
+        <div style="background: {color}; width: {pct}%; height: 100%; border-radius: 6px; 
+                    display: flex; align-items: center; justify-content: center; color: white; 
+                    font-size: 13px; font-weight: 600;">
+            {win} wins / {loss} losses
+        </div>
+    </div>
+</div>"""
+
+_TF_BAR_TMPL = """<div style="margin-bottom: 12px;">
+    <div style="display: flex; justify-content: space-between; margin-bottom: 4px;">
+        <span style="font-weight: 600; color: #1f4068;">{label}</span>
+        <span style="font-weight: 600; color: #666; font-size: 13px;">
+            {total:,} ops | <strong style="color: {color};">{wr:.1f}%</strong>
+        </span>
+    </div>
+    <div style="background: #e8eaed; border-radius: 4px; height: 24px; overflow: hidden;">
+        <div style="background: {color}; width: {pct}%; height: 100%; border-radius: 4px; 
+                    display: flex; align-items: center; padding-left: 8px; color: white; 
+                    font-size: 12px; font-weight: 600;">
+            {win} / {loss}
+        </div>
+    </div>
+</div>"""
+
+# Melhor / pior dia (gradiente c1 -> c2)
+_DAY_CARD_TMPL = """
+<div style="background: linear-gradient(135deg, {c1} 0%, {c2} 100%); 
+            border-radius: 12px; padding: 20px; color: white;">
+    <div style="font-size: 13px; opacity: 0.9; margin-bottom: 8px;">{title}</div>
+    <div style="font-size: 28px; font-weight: 700; margin: 8px 0;">{dia}</div>
+    <div style="font-size: 18px; font-weight: 600; margin-bottom: 8px;">{wr:.2f}%</div>
+    <div style="font-size: 13px; opacity: 0.9;">
+        {win} vitórias em {total} ops
+    </div>
+</div>
+"""
+
+_PERIOD_CARD_TMPL = """<div style="flex: 1 1 0; min-width: 180px; background: white; border-left: 4px solid {color}; 
+            border-radius: 8px; padding: 16px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+    <div style="font-size: 12px; color: #666; font-weight: 600; margin-bottom: 8px;">
+        {label}
+    </div>
+    <div style="font-size: 28px; font-weight: 700; color: {color};">
+        {wr:.2f}%
+    </div>
+    <div style="font-size: 12px; color: #666; margin-top: 8px;">
+        {total:,} operações<br>
+        {win} wins / {loss} losses
+    </div>
+</div>"""
+
+_DIR_CARD_TMPL = """<div style="flex: 1 1 0; min-width: 240px; background: linear-gradient(135deg, {color} 0%, {color}dd 100%); 
+            border-radius: 12px; padding: 20px; color: white;">
+    <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">
+        {icon} {label}
+    </div>
+    <div style="font-size: 32px; font-weight: 700; margin: 8px 0;">
+        {wr:.2f}%
+    </div>
+    <div style="font-size: 13px; opacity: 0.9;">
+        {total:,} operações<br>
+        {win} wins / {loss} losses
+    </div>
+</div>"""
 
 def _get_text_from_msg(msg: dict) -> str:
     for k in ("text", "message.text", "message", "message_text"):
@@ -57,70 +176,170 @@ def _get_date_from_msg(msg: dict):
                     pass
     return None
 
-def _extract_records(messages: List[dict]) -> List[dict]:
-    records = []
+def _get_date_str_from_msg(msg: dict):
+    """Texto cru da data (sem o "Z"), para o parse em lote no _extract_records."""
+    for key in ("date", "message.date"):
+        val = msg.get(key)
+        if isinstance(val, str):
+            return val.replace("Z", "")
+    return None
+
+def _parse_dates(messages: List[dict], positions) -> pd.Series:
+    """
+    Datas das mensagens em `positions` num único pd.to_datetime (inválidas viram NaT).
+    Se o lote tiver fusos misturados, cai no parse mensagem a mensagem.
+    """
+    raw = [_get_date_str_from_msg(messages[i]) for i in positions]
+    try:
+        return pd.Series(pd.to_datetime(raw, errors="coerce", format="ISO8601"))
+    except (ValueError, TypeError):
+        return pd.Series([_get_date_from_msg(messages[i]) for i in positions])
+
+def _extract_records(messages: List[dict]) -> pd.DataFrame:
+    """
+    Registros das mensagens resolvidas num DataFrame, com o parse feito por um único str.extract.
+    """
+    # A regex é ancorada no emoji de resultado: um startswith (em C) descarta o resto antes dela
+    texts, positions = [], []
+    for pos, msg in enumerate(messages):
+        text = _get_text_from_msg(msg).strip()
+        if text.startswith(_RESULT_CHECKS):
+            texts.append(text)
+            positions.append(pos)
+    texts = pd.Series(texts, index=positions, dtype=object)
+    # Quebras de linha viram espaço (mesmo efeito do " ".join(splitlines())) antes do match;
+    # o strip já foi feito acima, então não sobra quebra nas pontas
+    ex = texts.str.translate(NL_TRANS).str.extract(RESOLVED_RE)
+    ex = ex[ex["pair"].notna()]
     
-    for msg in messages:
-        text = _get_text_from_msg(msg)
-        if not text:
-            continue
-        one_line = " ".join(text.splitlines()).strip()
-        m = RESOLVED_RE.match(one_line)
-        if m:
-            try:
-                sup = m.group("sup") or ""
-                gale_level = _sup_to_level(sup)
-                pair = m.group("pair").strip()
-                time = m.group("time").strip()
-                tf = m.group("tf").strip()
-                direction = m.group("dir").strip()
-                
-                if "r" in m.groupdict():
-                    result_raw = m.group("r").strip().upper()
-                else:
-                    result_raw = m.groups()[-1].strip().upper()
-                    
-                result = "DOJI" if result_raw == "DOJI" else ("WIN" if result_raw == "WIN" else "LOSS")
-                
-                msg_date = _get_date_from_msg(msg)
-                
-                records.append({
-                    "pair": pair,
-                    "time": time,
-                    "tf": tf,
-                    "direction": direction,
-                    "result": result,
-                    "gale_level": gale_level,
-                    "msg_date": msg_date,
-                })
-            except:
-                continue
-                
-    return records
-
-def render_from_json(json_data: dict):
+    # Dimensões de baixa cardinalidade como category (groupby/crosstab sobre códigos de 1 byte)
+    result_raw = ex["r"].str.strip().str.upper()
+    return pd.DataFrame({
+        "pair": pd.Categorical(ex["pair"].str.strip()),
+        "time": ex["time"].str.strip().to_numpy(),
+        "tf": pd.Categorical(ex["tf"].str.strip()),
+        "direction": pd.Categorical(ex["dir"].str.strip()),
+        "result": pd.Categorical(
+            np.where(result_raw == "DOJI", "DOJI", np.where(result_raw == "WIN", "WIN", "LOSS")),
+            categories=_RESULTS,
+        ),
+        "gale_level": ex["sup"].map(SUPERSCRIPT_MAP).fillna(0).astype(np.int8).to_numpy(),
+        "msg_date": _parse_dates(messages, ex.index).to_numpy(),
+    })
+
+def _winloss_summaries(df: pd.DataFrame, keys: List[str]) -> Dict[str, pd.DataFrame]:
     """
-    Renderiza a página de Padrões e Tendências a partir do JSON.
+    Total de operações, WIN, LOSS e win rate (%) por valor de cada coluna de `keys`.
+    Todas as dimensões saem de um único np.bincount: cada uma ocupa uma faixa própria do
+    índice (deslocamento + código da chave * 3 + código do resultado). Chaves sem operações
+    ficam de fora.
     """
-    messages = json_data.get("messages", [])
-    records = _extract_records(messages)
-    df = pd.DataFrame(records)
+    n_res = len(_RESULTS)
+    res_codes = df["result"].cat.codes.to_numpy().astype(np.intp)
+
+    parts, layout, offset = [], [], 0
+    for key in keys:
+        col = df[key]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            codes, labels = col.cat.codes.to_numpy(), col.cat.categories
+        else:
+            codes, labels = pd.factorize(col, sort=True)
+        valid = codes >= 0
+        parts.append(offset + codes[valid].astype(np.intp) * n_res + res_codes[valid])
+        layout.append((key, labels, offset))
+        offset += len(labels) * n_res
 
+    all_counts = np.bincount(np.concatenate(parts), minlength=offset)
+
+    out = {}
+    for key, labels, start in layout:
+        counts = all_counts[start:start + len(labels) * n_res].reshape(len(labels), n_res)
+        observed = counts.sum(axis=1) > 0
+        counts = counts[observed]
+        frame = pd.DataFrame({
+            key: labels[observed],
+            "Total_Operacoes": counts.sum(axis=1),
+            "WIN": counts[:, 0],
+            "LOSS": counts[:, 1],
+        })
+        frame["Win_Rate_Pct"] = (frame["WIN"] / (frame["WIN"] + frame["LOSS"]) * 100).fillna(0).round(2)
+        out[key] = frame
+    return out
+
+def _win_rate_colors(win_rate: pd.Series, cuts: np.ndarray, colors: np.ndarray) -> np.ndarray:
+    """
+    Cor por faixa de win rate: `cuts` são os limites inferiores (inclusivos) das faixas seguintes.
+    """
+    return colors[np.searchsorted(cuts, win_rate.to_numpy(), side="right")]
+
+@st.cache_data(show_spinner=False)
+def _build_frames(fingerprint: tuple, _messages: List[dict]) -> dict:
+    """
+    Extração + agregações (dia da semana, período do mês, timeframe e direção) uma vez por
+    conjunto de mensagens. "status" é "vazio" sem registros e "sem_data" sem datas válidas.
+    """
+    df = _extract_records(_messages)
     if df.empty:
-        st.warning("⚠️ Nenhum dado disponível para análise de padrões.")
-        return
+        return {"status": "vazio"}
 
     # Filtrar apenas registros com data válida
     df = df[df["msg_date"].notnull()].copy()
-    
     if df.empty:
+        return {"status": "sem_data"}
+
+    # Adicionar colunas de data
+    df["weekday"] = df["msg_date"].dt.weekday.astype(np.int8)
+    df["day_name"] = df["weekday"].map(DIAS_SEMANA_PT).astype("category")
+    df["day_of_month"] = df["msg_date"].dt.day.astype(np.int8)
+
+    # Categórico ordenado: os períodos já saem em ordem (Início, Meio, Fim)
+    df["periodo_mes"] = pd.cut(df["day_of_month"], bins=_PERIOD_BINS, labels=_PERIOD_LABELS)
+
+    # As quatro dimensões numa contagem só; cada resumo já sai ordenado pela chave
+    summaries = _winloss_summaries(df, ["weekday", "periodo_mes", "tf", "direction"])
+
+    weekday_analysis = summaries["weekday"]
+    weekday_analysis["Dia_Semana"] = weekday_analysis["weekday"].map(DIAS_SEMANA_PT)
+
+    period_analysis = summaries["periodo_mes"]
+
+    tf_analysis = summaries["tf"].sort_values("Total_Operacoes", ascending=False)
+
+    dir_analysis = summaries["direction"]
+
+    # Cor de cada linha pelo win rate, classificada de uma vez (sem if/elif no render)
+    weekday_analysis["Cor"] = _win_rate_colors(weekday_analysis["Win_Rate_Pct"], _WEEKDAY_WR_CUTS, _WEEKDAY_COLORS)
+    for frame in (period_analysis, tf_analysis, dir_analysis):
+        frame["Cor"] = _win_rate_colors(frame["Win_Rate_Pct"], _WR_CUTS, _WR_COLORS)
+
+    return {
+        "status": "ok",
+        "weekday": weekday_analysis,
+        "period": period_analysis,
+        "tf": tf_analysis,
+        "dir": dir_analysis,
+    }
+
+def render_from_json(json_data: dict, fingerprint: tuple = None):
+    """
+    Renderiza a página de Padrões e Tendências a partir do JSON.
+    `fingerprint` é a chave do cache já calculada pelo app (se ausente, é calculada aqui).
+    """
+    messages = json_data.get("messages", [])
+    frames = _build_frames(fingerprint or messages_fingerprint(messages), messages)
+
+    if frames["status"] == "vazio":
+        st.warning("⚠️ Nenhum dado disponível para análise de padrões.")
+        return
+    
+    if frames["status"] == "sem_data":
         st.warning("⚠️ Nenhum registro com data válida encontrado.")
         return
 
-    # Adicionar colunas de data
-    df["weekday"] = df["msg_date"].dt.weekday
-    df["day_name"] = df["weekday"].map(DIAS_SEMANA_PT)
-    df["day_of_month"] = df["msg_date"].dt.day
+    weekday_analysis = frames["weekday"]
+    period_analysis = frames["period"]
+    tf_analysis = frames["tf"]
+    dir_analysis = frames["dir"]
 
     # ===== RENDERIZAÇÃO =====
     st.markdown("<h1 style='text-align:center; color:#1f4068; margin-bottom:30px;'>📊 Padrões e Tendências</h1>", unsafe_allow_html=True)
@@ -128,245 +347,92 @@ def render_from_json(json_data: dict):
     # ===== ANÁLISE POR DIA DA SEMANA =====
     st.markdown("### 📅 Performance por Dia da Semana")
     
-    weekday_analysis = df.groupby("weekday").agg(
-        Total_Operacoes=("result", "size"),
-        WIN=("result", lambda s: (s == "WIN").sum()),
-        LOSS=("result", lambda s: (s == "LOSS").sum()),
-    ).reset_index()
-    
-    weekday_analysis["Win_Rate_Pct"] = (
-        weekday_analysis["WIN"] / (weekday_analysis["WIN"] + weekday_analysis["LOSS"]) * 100
-    ).fillna(0).round(2)
-    
-    weekday_analysis["Dia_Semana"] = weekday_analysis["weekday"].map(DIAS_SEMANA_PT)
-    weekday_analysis = weekday_analysis.sort_values("weekday")
-    
     # Gráfico de barras por dia da semana
     st.markdown("#### 📊 Win Rate por Dia da Semana")
     
     max_ops_week = weekday_analysis["Total_Operacoes"].max()
     
-    for _, row in weekday_analysis.iterrows():
-        pct_bar = (row["Total_Operacoes"] / max_ops_week) * 100
-        wr = row["Win_Rate_Pct"]
-        
-        # Cor baseada no win rate
-        if wr >= 85:
-            color = "#0b8043"
-        elif wr >= 80:
-            color = "#1a73e8"
-        elif wr >= 75:
-            color = "#f9ab00"
-        else:
-            color = "#d93025"
-        
-        st.markdown(f"""
-        <div style="margin-bottom: 16px;">
-            <div style="display: flex; justify-content: space-between; margin-bottom: 6px;">
-                <span style="font-weight: 600; color: #1f4068; font-size: 14px;">{row['Dia_Semana']}</span>
-                <span style="font-weight: 600; color: #666; font-size: 13px;">
-                    {int(row['Total_Operacoes']):,} ops | WR: <strong style="color: {color};">{wr:.1f}%</strong>
-                </span>
-            </div>
-            <div style="background: #e8eaed; border-radius: 6px; height: 28px; overflow: hidden;">
-                <div style="background: {color}; width: {pct_bar}%; height: 100%; border-radius: 6px; 
-                            display: flex; align-items: center; justify-content: center; color: white; 
-                            font-size: 13px; font-weight: 600;">
-                    {int(row['WIN'])} wins / {int(row['LOSS'])} losses
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    bars = []
+    for dia, total, win, loss, wr, color in weekday_analysis[
+        ["Dia_Semana", "Total_Operacoes", "WIN", "LOSS", "Win_Rate_Pct", "Cor"]
+    ].itertuples(index=False, name=None):
+        bars.append(_WEEKDAY_BAR_TMPL.format(
+            label=dia, total=int(total), wr=wr, color=color,
+            pct=(total / max_ops_week) * 100, win=int(win), loss=int(loss),
+        ))
 
-    st.markdown("<br>", unsafe_allow_html=True)
+    # Todas as barras num único st.markdown
+    st.markdown(_BARS_TMPL.format(items="".join(bars)) + "<br>", unsafe_allow_html=True)
 
     # Cards de destaque - Melhor e Pior dia
-    best_day = weekday_analysis.loc[weekday_analysis["Win_Rate_Pct"].idxmax()]
-    worst_day = weekday_analysis.loc[weekday_analysis["Win_Rate_Pct"].idxmin()]
+    # Posicional sobre o array (argmax/argmin pegam a primeira ocorrência, como idxmax/idxmin)
+    wr_week = weekday_analysis["Win_Rate_Pct"].to_numpy()
+    best_day = weekday_analysis.iloc[int(wr_week.argmax())]
+    worst_day = weekday_analysis.iloc[int(wr_week.argmin())]
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #0b8043 0%, #12b35a 100%); 
-                    border-radius: 12px; padding: 20px; color: white;">
-            <div style="font-size: 13px; opacity: 0.9; margin-bottom: 8px;">🏆 MELHOR DIA</div>
-            <div style="font-size: 28px; font-weight: 700; margin: 8px 0;">{best_day['Dia_Semana']}</div>
-            <div style="font-size: 18px; font-weight: 600; margin-bottom: 8px;">{best_day['Win_Rate_Pct']:.2f}%</div>
-            <div style="font-size: 13px; opacity: 0.9;">
-                {int(best_day['WIN'])} vitórias em {int(best_day['Total_Operacoes'])} ops
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_DAY_CARD_TMPL.format(
+            c1="#0b8043", c2="#12b35a", title="🏆 MELHOR DIA", dia=best_day["Dia_Semana"],
+            wr=best_day["Win_Rate_Pct"], win=int(best_day["WIN"]), total=int(best_day["Total_Operacoes"]),
+        ), unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #d93025 0%, #ea4335 100%); 
-                    border-radius: 12px; padding: 20px; color: white;">
-            <div style="font-size: 13px; opacity: 0.9; margin-bottom: 8px;">⚠️ PIOR DIA</div>
-            <div style="font-size: 28px; font-weight: 700; margin: 8px 0;">{worst_day['Dia_Semana']}</div>
-            <div style="font-size: 18px; font-weight: 600; margin-bottom: 8px;">{worst_day['Win_Rate_Pct']:.2f}%</div>
-            <div style="font-size: 13px; opacity: 0.9;">
-                {int(worst_day['WIN'])} vitórias em {int(worst_day['Total_Operacoes'])} ops
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_DAY_CARD_TMPL.format(
+            c1="#d93025", c2="#ea4335", title="⚠️ PIOR DIA", dia=worst_day["Dia_Semana"],
+            wr=worst_day["Win_Rate_Pct"], win=int(worst_day["WIN"]), total=int(worst_day["Total_Operacoes"]),
+        ), unsafe_allow_html=True)
 
     st.markdown("<br><br>", unsafe_allow_html=True)
 
     # ===== ANÁLISE POR PERÍODO DO MÊS =====
     st.markdown("### 📆 Performance por Período do Mês")
     
-    def classify_period(day):
-        if day <= 10:
-            return "Início (1-10)"
-        elif day <= 20:
-            return "Meio (11-20)"
-        else:
-            return "Fim (21-31)"
-    
-    df["periodo_mes"] = df["day_of_month"].apply(classify_period)
-    
-    period_analysis = df.groupby("periodo_mes").agg(
-        Total_Operacoes=("result", "size"),
-        WIN=("result", lambda s: (s == "WIN").sum()),
-        LOSS=("result", lambda s: (s == "LOSS").sum()),
-    ).reset_index()
-    
-    period_analysis["Win_Rate_Pct"] = (
-        period_analysis["WIN"] / (period_analysis["WIN"] + period_analysis["LOSS"]) * 100
-    ).fillna(0).round(2)
+    # Cards de períodos (lado a lado num container flex, um só st.markdown)
+    cards = []
+    for periodo, total, win, loss, wr, color in period_analysis[
+        ["periodo_mes", "Total_Operacoes", "WIN", "LOSS", "Win_Rate_Pct", "Cor"]
+    ].itertuples(index=False, name=None):
+        cards.append(_PERIOD_CARD_TMPL.format(
+            label=periodo, color=color, wr=wr, total=int(total), win=int(win), loss=int(loss),
+        ))
     
-    # Ordenar por período
-    period_order = ["Início (1-10)", "Meio (11-20)", "Fim (21-31)"]
-    period_analysis["order"] = period_analysis["periodo_mes"].map({p: i for i, p in enumerate(period_order)})
-    period_analysis = period_analysis.sort_values("order")
-    
-    # Cards de períodos
-    cols = st.columns(3)
-    
-    for idx, (_, row) in enumerate(period_analysis.iterrows()):
-        with cols[idx]:
-            wr = row["Win_Rate_Pct"]
-            if wr >= 85:
-                color = "#0b8043"
-            elif wr >= 80:
-                color = "#1a73e8"
-            else:
-                color = "#f9ab00"
-            
-            st.markdown(f"""
-            <div style="background: white; border-left: 4px solid {color}; 
-                        border-radius: 8px; padding: 16px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                <div style="font-size: 12px; color: #666; font-weight: 600; margin-bottom: 8px;">
-                    {row['periodo_mes']}
-                </div>
-                <div style="font-size: 28px; font-weight: 700; color: {color};">
-                    {wr:.2f}%
-                </div>
-                <div style="font-size: 12px; color: #666; margin-top: 8px;">
-                    {int(row['Total_Operacoes']):,} operações<br>
-                    {int(row['WIN'])} wins / {int(row['LOSS'])} losses
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown(_CARDS_ROW_TMPL.format(items="".join(cards)) + "<br>", unsafe_allow_html=True)
 
     # ===== ANÁLISE DE TIMEFRAMES =====
     st.markdown("### ⏱️ Performance por Timeframe")
     
-    tf_analysis = df.groupby("tf").agg(
-        Total_Operacoes=("result", "size"),
-        WIN=("result", lambda s: (s == "WIN").sum()),
-        LOSS=("result", lambda s: (s == "LOSS").sum()),
-    ).reset_index()
-    
-    tf_analysis["Win_Rate_Pct"] = (
-        tf_analysis["WIN"] / (tf_analysis["WIN"] + tf_analysis["LOSS"]) * 100
-    ).fillna(0).round(2)
-    
-    tf_analysis = tf_analysis.sort_values("Total_Operacoes", ascending=False)
-    
     # Gráfico de timeframes
     if len(tf_analysis) > 0:
         max_ops_tf = tf_analysis["Total_Operacoes"].max()
         
-        for _, row in tf_analysis.head(10).iterrows():
-            pct_bar = (row["Total_Operacoes"] / max_ops_tf) * 100
-            wr = row["Win_Rate_Pct"]
-            
-            if wr >= 85:
-                color = "#0b8043"
-            elif wr >= 80:
-                color = "#1a73e8"
-            else:
-                color = "#f9ab00"
-            
-            st.markdown(f"""
-            <div style="margin-bottom: 12px;">
-                <div style="display: flex; justify-content: space-between; margin-bottom: 4px;">
-                    <span style="font-weight: 600; color: #1f4068;">{row['tf']}</span>
-                    <span style="font-weight: 600; color: #666; font-size: 13px;">
-                        {int(row['Total_Operacoes']):,} ops | <strong style="color: {color};">{wr:.1f}%</strong>
-                    </span>
-                </div>
-                <div style="background: #e8eaed; border-radius: 4px; height: 24px; overflow: hidden;">
-                    <div style="background: {color}; width: {pct_bar}%; height: 100%; border-radius: 4px; 
-                                display: flex; align-items: center; padding-left: 8px; color: white; 
-                                font-size: 12px; font-weight: 600;">
-                        {int(row['WIN'])} / {int(row['LOSS'])}
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        bars = []
+        for tf, total, win, loss, wr, color in tf_analysis[
+            ["tf", "Total_Operacoes", "WIN", "LOSS", "Win_Rate_Pct", "Cor"]
+        ].head(10).itertuples(index=False, name=None):
+            bars.append(_TF_BAR_TMPL.format(
+                label=tf, total=int(total), wr=wr, color=color,
+                pct=(total / max_ops_tf) * 100, win=int(win), loss=int(loss),
+            ))
+        
+        st.markdown(_BARS_TMPL.format(items="".join(bars)), unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
     # ===== ANÁLISE DE DIREÇÕES =====
     st.markdown("### 🔄 Performance por Direção")
     
-    dir_analysis = df.groupby("direction").agg(
-        Total_Operacoes=("result", "size"),
-        WIN=("result", lambda s: (s == "WIN").sum()),
-        LOSS=("result", lambda s: (s == "LOSS").sum()),
-    ).reset_index()
-    
-    dir_analysis["Win_Rate_Pct"] = (
-        dir_analysis["WIN"] / (dir_analysis["WIN"] + dir_analysis["LOSS"]) * 100
-    ).fillna(0).round(2)
+    chunks: List[str] = []
+    for direction, total, win, loss, wr, color in dir_analysis[
+        ["direction", "Total_Operacoes", "WIN", "LOSS", "Win_Rate_Pct", "Cor"]
+    ].itertuples(index=False, name=None):
+        chunks.append(_DIR_CARD_TMPL.format(
+            icon="📈" if direction.upper() in ["CALL", "UP"] else "📉", label=direction.upper(),
+            color=color, wr=wr, total=int(total), win=int(win), loss=int(loss),
+        ))
     
-    col1, col2 = st.columns(2)
-    
-    for idx, row in dir_analysis.iterrows():
-        with col1 if idx == 0 else col2:
-            wr = row["Win_Rate_Pct"]
-            icon = "📈" if row["direction"].upper() in ["CALL", "UP"] else "📉"
-            
-            if wr >= 85:
-                color = "#0b8043"
-            elif wr >= 80:
-                color = "#1a73e8"
-            else:
-                color = "#f9ab00"
-            
-            st.markdown(f"""
-            <div style="background: linear-gradient(135deg, {color} 0%, {color}dd 100%); 
-                        border-radius: 12px; padding: 20px; color: white;">
-                <div style="font-size: 14px; opacity: 0.9; margin-bottom: 8px;">
-                    {icon} {row['direction'].upper()}
-                </div>
-                <div style="font-size: 32px; font-weight: 700; margin: 8px 0;">
-                    {wr:.2f}%
-                </div>
-                <div style="font-size: 13px; opacity: 0.9;">
-                    {int(row['Total_Operacoes']):,} operações<br>
-                    {int(row['WIN'])} wins / {int(row['LOSS'])} losses
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown(_CARDS_ROW_TMPL.format(items="".join(chunks)) + "<br>", unsafe_allow_html=True)
 
     # ===== TABELAS COMPLETAS =====
     st.markdown("### 📋 Tabelas Detalhadas")
@@ -376,62 +442,37 @@ def render_from_json(json_data: dict):
     with tab1:
         display_week = weekday_analysis[["Dia_Semana", "Total_Operacoes", "WIN", "LOSS", "Win_Rate_Pct"]].copy()
         display_week.columns = ["Dia da Semana", "Total Ops", "WIN", "LOSS", "Win Rate"]
-        display_week["Total Ops"] = display_week["Total Ops"].apply(lambda x: f"{int(x):,}")
-        display_week["WIN"] = display_week["WIN"].apply(lambda x: f"{int(x):,}")
-        display_week["LOSS"] = display_week["LOSS"].apply(lambda x: f"{int(x):,}")
-        display_week["Win Rate"] = display_week["Win Rate"].apply(lambda x: f"{x:.2f}%")
-        
-        st.markdown("""
-        <style>
-        .pattern-table {
-            border-collapse: collapse;
-            width: 100%;
-            font-family: "Inter", "Arial", sans-serif;
-        }
-        .pattern-table th {
-            background-color: #f7f9fc;
-            color: #333;
-            padding: 12px;
-            text-align: left;
-            font-weight: 600;
-            border-bottom: 2px solid #e6eef6;
-        }
-        .pattern-table td {
-            padding: 10px 12px;
-            border-top: 1px solid #f0f4f8;
-            color: #333;
-        }
-        .pattern-table tr:hover {
-            background-color: #f8f9fa;
-        }
-        </style>
-        """, unsafe_allow_html=True)
+        display_week["Total Ops"] = display_week["Total Ops"].map("{:,}".format)
+        display_week["WIN"] = display_week["WIN"].map("{:,}".format)
+        display_week["LOSS"] = display_week["LOSS"].map("{:,}".format)
+        display_week["Win Rate"] = display_week["Win Rate"].map("{:.2f}%".format)
         
-        html_week = display_week.to_html(index=False, escape=False, classes="pattern-table")
-        st.markdown(f'<div style="overflow-x: auto; padding: 10px; background: #ffffff; border-radius: 8px; border: 1px solid #eef2f6;">{html_week}</div>', unsafe_allow_html=True)
+        html_week = html_table("pattern-table", list(display_week.columns), display_week.itertuples(index=False, name=None))
+        # O CSS vai junto com a primeira tabela (uma mensagem a menos para o front-end)
+        st.markdown(_PATTERN_TABLE_CSS + _TABLE_WRAP_TMPL.format(table=html_week), unsafe_allow_html=True)
     
     with tab2:
         display_period = period_analysis[["periodo_mes", "Total_Operacoes", "WIN", "LOSS", "Win_Rate_Pct"]].copy()
         display_period.columns = ["Período", "Total Ops", "WIN", "LOSS", "Win Rate"]
-        display_period["Total Ops"] = display_period["Total Ops"].apply(lambda x: f"{int(x):,}")
-        display_period["WIN"] = display_period["WIN"].apply(lambda x: f"{int(x):,}")
-        display_period["LOSS"] = display_period["LOSS"].apply(lambda x: f"{int(x):,}")
-        display_period["Win Rate"] = display_period["Win Rate"].apply(lambda x: f"{x:.2f}%")
+        display_period["Total Ops"] = display_period["Total Ops"].map("{:,}".format)
+        display_period["WIN"] = display_period["WIN"].map("{:,}".format)
+        display_period["LOSS"] = display_period["LOSS"].map("{:,}".format)
+        display_period["Win Rate"] = display_period["Win Rate"].map("{:.2f}%".format)
         
-        html_period = display_period.to_html(index=False, escape=False, classes="pattern-table")
-        st.markdown(f'<div style="overflow-x: auto; padding: 10px; background: #ffffff; border-radius: 8px; border: 1px solid #eef2f6;">{html_period}</div>', unsafe_allow_html=True)
+        html_period = html_table("pattern-table", list(display_period.columns), display_period.itertuples(index=False, name=None))
+        st.markdown(_TABLE_WRAP_TMPL.format(table=html_period), unsafe_allow_html=True)
 
     # ===== INSIGHTS =====
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown("### 💡 Insights Identificados")
     
     # Insights automáticos
-    diff_weekday = weekday_analysis["Win_Rate_Pct"].max() - weekday_analysis["Win_Rate_Pct"].min()
+    diff_weekday = wr_week.max() - wr_week.min()
     if diff_weekday > 5:
         st.warning(f"⚠️ **Variação significativa entre dias da semana**: Diferença de {diff_weekday:.1f}% entre melhor e pior dia. Considere focar nos dias com melhor performance.")
     else:
         st.success("✅ **Consistência entre dias**: Performance estável ao longo da semana, com variação de apenas {diff_weekday:.1f}%.")
     
     # Insight de período
-    best_period = period_analysis.loc[period_analysis["Win_Rate_Pct"].idxmax()]
+    best_period = period_analysis.iloc[int(period_analysis["Win_Rate_Pct"].to_numpy().argmax())]
     st.info(f"📆 **Melhor período do mês**: {best_period['periodo_mes']} com {best_period['Win_Rate_Pct']:.2f}% de win rate.")
\ No newline at end of file
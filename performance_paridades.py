@@ -3,16 +3,28 @@ import re
 from datetime import datetime
 from typing import List, Dict
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-# Regex para mensagens resolvidas
+from comum import NL_TRANS, messages_fingerprint
+
+# Regex para mensagens resolvidas (re da stdlib: ancorada e com separadores literais, não tem
+# backtracking patológico que justifique outro motor)
 RESOLVED_RE = re.compile(
     r"^(?P<check>[✅❌🃏])(?P<sup>[\u00b9\u00b2\u00b3\d]?)\s*"
     r"(?P<pair>[A-Z0-9\-\_]+(?:-OTC)?)\s*-\s*(?P<time>\d{2}:\d{2}:\d{2})\s*-\s*(?P<tf>\w+)\s*-\s*(?P<dir>\w+)\s*-\s*(?P<result>WIN|LOSS|DOJI)$",
     flags=re.IGNORECASE,
 )
 
+_RESULT_CHECKS = ("✅", "❌", "🃏")
+_RESULTS = ["WIN", "LOSS", "DOJI"]
+
+# Campos da mensagem de sinal, compilados uma vez (sem passar pelo cache do re a cada mensagem)
+SIGNAL_PAIR_RE = re.compile(r"Ativo:\s*([A-Z0-9\-\_]+(?:-OTC)?)", re.IGNORECASE)
+SIGNAL_TIME_RE = re.compile(r"Hor[aá]rio:\s*(\d{2}:\d{2}:\d{2})", re.IGNORECASE)
+SIGNAL_PAYOUT_RE = re.compile(r"Payout:\s*([\d\.]+)\s*%", re.IGNORECASE)
+
 SUPERSCRIPT_MAP = {
     "\u00b9": 1,
     "\u00b2": 2,
@@ -27,8 +39,15 @@ def _sup_to_level(s: str) -> int:
         return 0
     return SUPERSCRIPT_MAP.get(s, 0)
 
+# Chaves alternativas de texto, depois de "text" (que cobre o export do Telegram)
+_OTHER_TEXT_KEYS = ("message.text", "message", "message_text")
+
 def _get_text_from_msg(msg: dict) -> str:
-    for k in ("text", "message.text", "message", "message_text"):
+    # Caminho comum: "text" é a primeira chave consultada, então devolver aqui não muda nada
+    v = msg.get("text")
+    if type(v) is str and v.strip():
+        return v
+    for k in _OTHER_TEXT_KEYS:
         v = msg.get(k)
         if isinstance(v, str) and v.strip():
             return v
@@ -36,17 +55,21 @@ def _get_text_from_msg(msg: dict) -> str:
     return v if isinstance(v, str) else ""
 
 def _extract_records(messages: List[dict]) -> List[dict]:
+    """
+    Sinais (payout por paridade/horário) e mensagens resolvidas numa única passada.
+    O payout entra no fim, quando o dicionário de sinais já está completo.
+    """
     records = []
     signals = {}
     
     for msg in messages:
         text = _get_text_from_msg(msg)
-        if not isinstance(text, str):
+        if not text:
             continue
         if "Ativo:" in text or "Payout:" in text:
-            m_pair = re.search(r"Ativo:\s*([A-Z0-9\-\_]+(?:-OTC)?)", text, re.IGNORECASE)
-            m_time = re.search(r"Hor[aá]rio:\s*(\d{2}:\d{2}:\d{2})", text, re.IGNORECASE)
-            m_pay = re.search(r"Payout:\s*([\d\.]+)\s*%", text, re.IGNORECASE)
+            m_pair = SIGNAL_PAIR_RE.search(text)
+            m_time = SIGNAL_TIME_RE.search(text)
+            m_pay = SIGNAL_PAYOUT_RE.search(text)
             if m_pair and m_time:
                 p = m_pair.group(1).strip()
                 t = m_time.group(1).strip()
@@ -58,12 +81,13 @@ def _extract_records(messages: List[dict]) -> List[dict]:
                         payout = None
                 signals[(p, t)] = payout
 
-    for msg in messages:
-        text = _get_text_from_msg(msg)
-        if not text:
+        # Mesmo resultado do " ".join(text.splitlines()).strip(), sem lista intermediária:
+        # strip primeiro (tira as quebras das pontas), depois as quebras internas viram espaço.
+        # A regex é ancorada no emoji, então o startswith descarta o resto antes do match.
+        one_line = text.strip()
+        if not one_line.startswith(_RESULT_CHECKS):
             continue
-        one_line = " ".join(text.splitlines()).strip()
-        m = RESOLVED_RE.match(one_line)
+        m = RESOLVED_RE.fullmatch(one_line.translate(NL_TRANS))
         if m:
             try:
                 sup = m.group("sup") or ""
@@ -83,7 +107,6 @@ def _extract_records(messages: List[dict]) -> List[dict]:
                     result_raw = m.groups()[-1].strip().upper()
                     
                 result = "DOJI" if result_raw == "DOJI" else ("WIN" if result_raw == "WIN" else "LOSS")
-                payout = signals.get((pair, time))
             except Exception as e:
                 # Se der erro, pula esta mensagem
                 continue
@@ -95,61 +118,91 @@ def _extract_records(messages: List[dict]) -> List[dict]:
                 "direction": direction,
                 "result": result,
                 "gale_level": gale_level,
-                "payout": payout,
+                "payout": None,
             })
+
+    # Sinal que chega depois do resultado também vale (o dicionário já está completo aqui)
+    for rec in records:
+        rec["payout"] = signals.get((rec["pair"], rec["time"]))
     return records
 
-def _calculate_volatility(wins, losses):
+def _pair_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Total, WIN/LOSS/DOJI e G0/G1/G2 por paridade (em ordem alfabética). Paridade, resultado e
+    gale viram códigos inteiros e cada matriz de contagem sai de um único np.bincount.
     """
-    Calcula volatilidade baseada na dispersão dos resultados.
+    codes, pairs = pd.factorize(df["pair"], sort=True)
+    n = len(pairs)
+    res = pd.Categorical(df["result"], categories=_RESULTS).codes.astype(np.intp)
+    gale = df["gale_level"].to_numpy(dtype=np.intp)
+
+    res_counts = np.bincount(codes * 3 + res, minlength=n * 3).reshape(n, 3)
+    gale_counts = np.bincount(codes * 4 + gale, minlength=n * 4).reshape(n, 4)
+    return pd.DataFrame({
+        "pair": pairs,
+        "Total_Operacoes": np.bincount(codes, minlength=n),
+        "WIN": res_counts[:, 0],
+        "LOSS": res_counts[:, 1],
+        "DOJI": res_counts[:, 2],
+        "G0": gale_counts[:, 0],
+        "G1": gale_counts[:, 1],
+        "G2": gale_counts[:, 2],
+    })
+
+def _calculate_volatility(wins: np.ndarray, losses: np.ndarray) -> np.ndarray:
+    """
+    Calcula volatilidade baseada na dispersão dos resultados (vetorizado, uma paridade por posição).
     Quanto maior a proporção de losses, maior a volatilidade/risco.
     """
     total = wins + losses
-    if total == 0:
-        return 0.0
-    loss_rate = (losses / total) * 100.0
-    return loss_rate
+    with np.errstate(divide="ignore", invalid="ignore"):
+        loss_rate = losses / total * 100.0
+    return np.where(total == 0, 0.0, loss_rate)
+
+# Faixas de classificação, na ordem de prioridade (a primeira que casar vale)
+_CLASSES = ["SEM_DADOS", "EXCELENTE", "BOM", "OK", "REGULAR"]
+_CLASS_COLORS = ["#9aa0a6", "#0b8043", "#1a73e8", "#f9ab00", "#f29900"]
+
+# Selo colorido de cada classificação na tabela detalhada
+_CLASS_BADGES = {
+    "EXCELENTE": '<span style="color: #0b8043; font-weight: 700;">★ EXCELENTE</span>',
+    "BOM": '<span style="color: #1a73e8; font-weight: 700;">● BOM</span>',
+    "OK": '<span style="color: #f9ab00; font-weight: 600;">◐ OK</span>',
+    "REGULAR": '<span style="color: #f29900; font-weight: 600;">◔ REGULAR</span>',
+    "PERIGOSO": '<span style="color: #d93025; font-weight: 600;">✗ PERIGOSO</span>',
+    "SEM_DADOS": '<span style="color: #9aa0a6; font-weight: 500;">○ SEM_DADOS</span>',
+}
 
-def _classify_pair(win_rate_pct, volatility_pct, total_ops):
+def _classify_pairs(win_rate_pct: np.ndarray, volatility_pct: np.ndarray, total_ops: np.ndarray):
     """
-    Classifica a paridade baseado no win rate, volatilidade e volume.
+    Classifica as paridades baseado no win rate, volatilidade e volume.
+    Devolve (classificação, cor) como arrays, via np.select sobre as máscaras de cada faixa.
     """
-    if total_ops < 5:
-        return "SEM_DADOS", "#9aa0a6"
-    
-    if win_rate_pct >= 90 and volatility_pct <= 15:
-        return "EXCELENTE", "#0b8043"
-    elif win_rate_pct >= 85 and volatility_pct <= 18:
-        return "BOM", "#1a73e8"
-    elif win_rate_pct >= 80 and volatility_pct <= 25:
-        return "OK", "#f9ab00"
-    elif win_rate_pct >= 75:
-        return "REGULAR", "#f29900"
-    else:
-        return "PERIGOSO", "#d93025"
-
-def render_from_json(json_data: dict):
+    conds = [
+        total_ops < 5,
+        (win_rate_pct >= 90) & (volatility_pct <= 15),
+        (win_rate_pct >= 85) & (volatility_pct <= 18),
+        (win_rate_pct >= 80) & (volatility_pct <= 25),
+        win_rate_pct >= 75,
+    ]
+    classes = np.select(conds, _CLASSES, default="PERIGOSO").astype(object)
+    colors = np.select(conds, _CLASS_COLORS, default="#d93025").astype(object)
+    return classes, colors
+
+@st.cache_data(show_spinner=False)
+def _build_frames(fingerprint: tuple, _messages: List[dict]):
     """
-    Renderiza a página de Performance de Paridades a partir do JSON.
+    Extração, métricas por paridade e tabela formatada uma vez por conjunto de mensagens.
+    Devolve None quando não há registros.
     """
-    messages = json_data.get("messages", [])
-    records = _extract_records(messages)
+    records = _extract_records(_messages)
     df = pd.DataFrame(records)
 
     if df.empty:
-        st.warning("⚠️ Nenhum dado disponível para análise de paridades.")
-        return
+        return None
 
     # Agrupar por paridade
-    pair_analysis = df.groupby("pair").agg(
-        Total_Operacoes=("result", "size"),
-        WIN=("result", lambda s: (s == "WIN").sum()),
-        LOSS=("result", lambda s: (s == "LOSS").sum()),
-        DOJI=("result", lambda s: (s == "DOJI").sum()),
-        G0=("gale_level", lambda s: (s == 0).sum()),
-        G1=("gale_level", lambda s: (s == 1).sum()),
-        G2=("gale_level", lambda s: (s == 2).sum()),
-    ).reset_index()
+    pair_analysis = _pair_counts(df)
 
     # Calcular métricas
     pair_analysis["Win_Rate_Pct"] = (
@@ -164,23 +217,61 @@ def render_from_json(json_data: dict):
         pair_analysis["G2"] / pair_analysis["Total_Operacoes"] * 100
     ).fillna(0).round(2)
     
-    pair_analysis["Volatilidade_Pct"] = pair_analysis.apply(
-        lambda row: _calculate_volatility(row["WIN"], row["LOSS"]), axis=1
+    pair_analysis["Volatilidade_Pct"] = _calculate_volatility(
+        pair_analysis["WIN"].to_numpy(), pair_analysis["LOSS"].to_numpy()
     ).round(2)
 
     # Classificação
-    pair_analysis[["Classificacao", "Cor"]] = pair_analysis.apply(
-        lambda row: pd.Series(_classify_pair(
-            row["Win_Rate_Pct"], 
-            row["Volatilidade_Pct"],
-            row["Total_Operacoes"]
-        )),
-        axis=1
+    pair_analysis["Classificacao"], pair_analysis["Cor"] = _classify_pairs(
+        pair_analysis["Win_Rate_Pct"].to_numpy(),
+        pair_analysis["Volatilidade_Pct"].to_numpy(),
+        pair_analysis["Total_Operacoes"].to_numpy(),
     )
 
     # Ordenar por total de operações (mais operadas primeiro)
     pair_analysis = pair_analysis.sort_values("Total_Operacoes", ascending=False)
 
+    # Preparar tabela para exibição
+    display_df = pair_analysis[[
+        "pair", "Total_Operacoes", "WIN", "LOSS",
+        "Win_Rate_Pct", "Pct_Gale1", "Pct_Gale2", "Volatilidade_Pct", "Classificacao"
+    ]].copy()
+
+    # Formatar colunas (bound str.format por coluna; zeros viram "—" / "0%" via where)
+    for col in ("Total_Operacoes", "WIN", "LOSS"):
+        display_df[col] = display_df[col].map("{:,}".format).where(display_df[col] > 0, "—")
+    display_df["Win_Rate_Pct"] = (
+        display_df["Win_Rate_Pct"].map("{:.2f}%".format).where(display_df["Win_Rate_Pct"] > 0, "0%")
+    )
+    for col in ("Pct_Gale1", "Pct_Gale2", "Volatilidade_Pct"):
+        display_df[col] = display_df[col].map("{:.1f}%".format)
+
+    # Colorir classificação (uma consulta no dicionário por linha)
+    display_df["Classificacao"] = display_df["Classificacao"].map(_CLASS_BADGES)
+
+    # Renomear colunas
+    display_df.columns = [
+        "Paridade", "Total Ops", "Vitórias", "Derrotas",
+        "Win Rate", "% Gale 1", "% Gale 2", "Volatilidade", "Classificação"
+    ]
+
+    return {"pairs": pair_analysis, "display": display_df}
+
+def render_from_json(json_data: dict, fingerprint: tuple = None):
+    """
+    Renderiza a página de Performance de Paridades a partir do JSON.
+    `fingerprint` é a chave do cache já calculada pelo app (se ausente, é calculada aqui).
+    """
+    messages = json_data.get("messages", [])
+    frames = _build_frames(fingerprint or messages_fingerprint(messages), messages)
+
+    if frames is None:
+        st.warning("⚠️ Nenhum dado disponível para análise de paridades.")
+        return
+
+    pair_analysis = frames["pairs"]
+    display_df = frames["display"]
+
     # ===== RENDERIZAÇÃO =====
     st.markdown("<h1 style='text-align:center; color:#1f4068; margin-bottom:30px;'>💱 Performance de Paridades</h1>", unsafe_allow_html=True)
 
@@ -254,35 +345,43 @@ def render_from_json(json_data: dict):
     
     with col_top:
         st.markdown("### 🏆 Top 3 Melhores Paridades")
-        for idx, row in top_pairs.iterrows():
-            st.markdown(f"""
+        cards = []
+        for pair, wr, win, total in top_pairs[
+            ["pair", "Win_Rate_Pct", "WIN", "Total_Operacoes"]
+        ].itertuples(index=False, name=None):
+            cards.append(f"""
             <div style="background: #e8f5e9; border-left: 4px solid #0b8043; 
                         border-radius: 8px; padding: 12px; margin-bottom: 8px;">
                 <div style="font-size: 16px; font-weight: 700; color: #1f4068;">
-                    {row['pair']}
+                    {pair}
                 </div>
                 <div style="font-size: 13px; color: #666; margin-top: 4px;">
-                    Win Rate: <strong>{row['Win_Rate_Pct']:.2f}%</strong> | 
-                    {int(row['WIN'])} vitórias em {int(row['Total_Operacoes'])} ops
+                    Win Rate: <strong>{wr:.2f}%</strong> | 
+                    {int(win)} vitórias em {int(total)} ops
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """.strip())
+        st.markdown("".join(cards), unsafe_allow_html=True)
     
     with col_bottom:
         st.markdown("### ⚠️ Top 3 Piores Paridades")
-        for idx, row in bottom_pairs.iterrows():
-            st.markdown(f"""
+        cards = []
+        for pair, wr, win, total in bottom_pairs[
+            ["pair", "Win_Rate_Pct", "WIN", "Total_Operacoes"]
+        ].itertuples(index=False, name=None):
+            cards.append(f"""
             <div style="background: #fce4ec; border-left: 4px solid #d93025; 
                         border-radius: 8px; padding: 12px; margin-bottom: 8px;">
                 <div style="font-size: 16px; font-weight: 700; color: #1f4068;">
-                    {row['pair']}
+                    {pair}
                 </div>
                 <div style="font-size: 13px; color: #666; margin-top: 4px;">
-                    Win Rate: <strong>{row['Win_Rate_Pct']:.2f}%</strong> | 
-                    {int(row['WIN'])} vitórias em {int(row['Total_Operacoes'])} ops
+                    Win Rate: <strong>{wr:.2f}%</strong> | 
+                    {int(win)} vitórias em {int(total)} ops
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """.strip())
+        st.markdown("".join(cards), unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
@@ -294,69 +393,35 @@ def render_from_json(json_data: dict):
     # Criar gráfico de barras horizontal simples com HTML/CSS
     max_ops = top10["Total_Operacoes"].max()
     
-    for _, row in top10.iterrows():
-        pct = (row["Total_Operacoes"] / max_ops) * 100
-        color = row["Cor"]
+    bars = []
+    for pair, total, wr, color in top10[
+        ["pair", "Total_Operacoes", "Win_Rate_Pct", "Cor"]
+    ].itertuples(index=False, name=None):
+        pct = (total / max_ops) * 100
         
-        st.markdown(f"""
+        bars.append(f"""
         <div style="margin-bottom: 12px;">
             <div style="display: flex; justify-content: space-between; margin-bottom: 4px;">
-                <span style="font-weight: 600; color: #1f4068;">{row['pair']}</span>
-                <span style="font-weight: 700; color: {color};">{int(row['Total_Operacoes']):,} ops</span>
+                <span style="font-weight: 600; color: #1f4068;">{pair}</span>
+                <span style="font-weight: 700; color: {color};">{int(total):,} ops</span>
             </div>
             <div style="background: #e8eaed; border-radius: 4px; height: 24px; overflow: hidden;">
                 <div style="background: {color}; width: {pct}%; height: 100%; border-radius: 4px; 
                             display: flex; align-items: center; padding-left: 8px; color: white; font-size: 12px; font-weight: 600;">
-                    {row['Win_Rate_Pct']:.1f}%
+                    {wr:.1f}%
                 </div>
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """.strip())
+
+    # Todas as barras num único st.markdown
+    st.markdown("<div>" + "".join(bars) + "</div>", unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
     # ===== TABELA DETALHADA =====
     st.markdown("### 📋 Análise Completa de Todas as Paridades")
 
-    # Preparar tabela para exibição
-    display_df = pair_analysis[[
-        "pair", "Total_Operacoes", "WIN", "LOSS",
-        "Win_Rate_Pct", "Pct_Gale1", "Pct_Gale2", "Volatilidade_Pct", "Classificacao"
-    ]].copy()
-
-    # Formatar colunas
-    display_df["Total_Operacoes"] = display_df["Total_Operacoes"].apply(lambda x: f"{int(x):,}" if x > 0 else "—")
-    display_df["WIN"] = display_df["WIN"].apply(lambda x: f"{int(x):,}" if x > 0 else "—")
-    display_df["LOSS"] = display_df["LOSS"].apply(lambda x: f"{int(x):,}" if x > 0 else "—")
-    display_df["Win_Rate_Pct"] = display_df["Win_Rate_Pct"].apply(lambda x: f"{x:.2f}%" if x > 0 else "0%")
-    display_df["Pct_Gale1"] = display_df["Pct_Gale1"].apply(lambda x: f"{x:.1f}%")
-    display_df["Pct_Gale2"] = display_df["Pct_Gale2"].apply(lambda x: f"{x:.1f}%")
-    display_df["Volatilidade_Pct"] = display_df["Volatilidade_Pct"].apply(lambda x: f"{x:.1f}%")
-
-    # Colorir classificação
-    def color_classification(row):
-        classif = row["Classificacao"]
-        if classif == "EXCELENTE":
-            return f'<span style="color: #0b8043; font-weight: 700;">★ {classif}</span>'
-        elif classif == "BOM":
-            return f'<span style="color: #1a73e8; font-weight: 700;">● {classif}</span>'
-        elif classif == "OK":
-            return f'<span style="color: #f9ab00; font-weight: 600;">◐ {classif}</span>'
-        elif classif == "REGULAR":
-            return f'<span style="color: #f29900; font-weight: 600;">◔ {classif}</span>'
-        elif classif == "PERIGOSO":
-            return f'<span style="color: #d93025; font-weight: 600;">✗ {classif}</span>'
-        else:
-            return f'<span style="color: #9aa0a6; font-weight: 500;">○ {classif}</span>'
-
-    display_df["Classificacao"] = display_df.apply(color_classification, axis=1)
-
-    # Renomear colunas
-    display_df.columns = [
-        "Paridade", "Total Ops", "Vitórias", "Derrotas",
-        "Win Rate", "% Gale 1", "% Gale 2", "Volatilidade", "Classificação"
-    ]
-
     # Renderizar tabela
     st.markdown("""
     <style>